@@ -2,32 +2,222 @@ from flask import Flask, request, render_template
 import os
 import json
 import time
+import numpy as np
+import hashlib
+import threading
+from collections import OrderedDict
 
-from utils.static_analysis import analyze_code
-from utils.feature_extract import metrics_to_features, load_or_train_model
+# orjson is optional; it pretty-prints the metrics several times faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# tl2cgen is optional; it runs the model compiled by `train_model.py --treelite`
+try:
+    import tl2cgen
+    TL2CGEN_AVAILABLE = True
+except ImportError:
+    TL2CGEN_AVAILABLE = False
+
+# flask-compress is optional; it gzips/brotli-encodes the HTML and metrics JSON
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+
+from utils.static_analysis import analyze_code_stream
+from utils.feature_extract import FEATURE_COLUMNS, fast_predictor, load_or_train_model
 
 
 app = Flask(__name__)
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, 'model', 'defect_model.pkl')
+TREELITE_LIB_PATH = os.path.join(BASE_DIR, 'model', 'defect_model.so')
+
+# (model, model_name, model file mtime) once loaded; see _get_model()
+_MODEL_CACHE = None
+
+# Uploads are hashed in blocks of this size
+_HASH_BLOCK_SIZE = 64 * 1024
+
+# Results for recently seen uploads, keyed by the SHA-256 of their bytes
+_RESULT_CACHE_SIZE = 1024
+_RESULT_CACHE = OrderedDict()
+_RESULT_CACHE_LOCK = threading.Lock()
+
+if COMPRESS_AVAILABLE:
+    app.config['COMPRESS_MIMETYPES'] = [
+        'text/html', 'application/json', 'text/css', 'application/javascript',
+    ]
+    Compress(app)
+
+# Werkzeug rejects larger request bodies with 413 before the form is parsed
+app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024
+
 # Disable caching in development mode
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
 
+# Static assets only change between deploys, so one token per process is enough
+_CACHE_BUST = int(time.time())
+
 # Add cache-busting context processor
 @app.context_processor
 def inject_cache_bust():
-    return dict(cache_bust=int(time.time()))
+    return dict(cache_bust=_CACHE_BUST)
 
 
-def _read_file_storage_to_text(file_storage) -> str:
-    """Read an uploaded file (werkzeug FileStorage) into a UTF-8 string.
+# Compile the page template once; rendering the Template object skips the
+# loader's per-request lookup and mtime check
+_INDEX_TEMPLATE = app.jinja_env.get_template('index.html')
 
-    Tries utf-8 first, then latin-1 as a fallback to avoid hard failures on odd encodings.
+
+def _iter_upload_lines(file_storage):
+    """Iterate over the raw byte lines of an uploaded file (werkzeug FileStorage).
+
+    analyze_code_stream() scans UTF-8 bytes directly, so the upload is neither
+    held in memory as a whole nor decoded to text.
     """
-    raw = file_storage.read()
+    return iter(file_storage.stream)
+
+
+def _upload_is_empty(file_storage):
+    """Return True if the upload has no bytes, judged by its stream size.
+
+    Streams that cannot seek are reported as non-empty and left to the
+    analysis.
+    """
+    stream = file_storage.stream
+    if not stream.seekable():
+        return False
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(0)
+    return size == 0
+
+
+def _hash_upload(file_storage):
+    """Return the SHA-256 hex digest of an upload and rewind its stream.
+
+    Returns None if the stream cannot be rewound, in which case the upload is
+    analyzed without consulting the result cache.
+    """
+    stream = file_storage.stream
+    if not stream.seekable():
+        return None
+    digest = hashlib.sha256()
+    while True:
+        block = stream.read(_HASH_BLOCK_SIZE)
+        if not block:
+            break
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def _cached_result(key):
+    """Return the cached result for an upload digest, or None."""
+    if key is None:
+        return None
+    with _RESULT_CACHE_LOCK:
+        result = _RESULT_CACHE.get(key)
+        if result is not None:
+            _RESULT_CACHE.move_to_end(key)
+        return result
+
+
+def _store_result(key, result) -> None:
+    """Cache a result under an upload digest, evicting the oldest entries."""
+    if key is None:
+        return
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE[key] = result
+        _RESULT_CACHE.move_to_end(key)
+        while len(_RESULT_CACHE) > _RESULT_CACHE_SIZE:
+            _RESULT_CACHE.popitem(last=False)
+
+
+def _dumps(obj) -> str:
+    """Serialize obj as 2-space indented JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+class TreelitePredictor:
+    """Predict with a TL2cgen-compiled model, mirroring the sklearn predict() API."""
+
+    def __init__(self, lib_path, classes):
+        self._predictor = tl2cgen.Predictor(lib_path, nthread=1)
+        self.classes_ = np.asarray(classes)
+
+    def predict(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        scores = self._predictor.predict(tl2cgen.DMatrix(X)).reshape(X.shape[0], -1)
+        if scores.shape[1] == 1:
+            # Binary models with a single output give the positive-class probability
+            return self.classes_[(scores[:, 0] > 0.5).astype(int)]
+        return self.classes_[scores.argmax(axis=1)]
+
+
+def _load_compiled(model):
+    """Return a TreelitePredictor for the model if an up-to-date compiled
+    library exists, otherwise the model itself."""
+    if not TL2CGEN_AVAILABLE or not hasattr(model, 'classes_'):
+        return model
+    try:
+        if os.stat(TREELITE_LIB_PATH).st_mtime < os.stat(MODEL_PATH).st_mtime:
+            return model  # compiled from an older model
+        return TreelitePredictor(TREELITE_LIB_PATH, model.classes_)
+    except Exception:
+        return model
+
+
+def _get_model():
+    """Return the (model, model_name) pair, loading it once per process.
+
+    In debug mode the model file is stat'ed on each call and reloaded when its
+    mtime changes, so a retrained model is picked up without a restart.
+    """
+    global _MODEL_CACHE
+    if _MODEL_CACHE is not None and not app.debug:
+        return _MODEL_CACHE[:2]
     try:
-        return raw.decode("utf-8")
-    except UnicodeDecodeError:
-        return raw.decode("latin-1", errors="ignore")
+        mtime = os.stat(MODEL_PATH).st_mtime
+    except OSError:
+        mtime = None
+    if _MODEL_CACHE is None or _MODEL_CACHE[2] != mtime:
+        model, model_name = load_or_train_model(MODEL_PATH)
+        # Single-row predictions gain nothing from a thread pool, only its startup cost
+        if hasattr(model, 'n_jobs'):
+            model.n_jobs = 1
+        # A compiled library wins; otherwise forests vote tree by tree
+        model = fast_predictor(_load_compiled(model))
+        _warm_up(model)
+        _MODEL_CACHE = (model, model_name, mtime)
+        # Cached results came from the previous model
+        with _RESULT_CACHE_LOCK:
+            _RESULT_CACHE.clear()
+    return _MODEL_CACHE[:2]
+
+
+def _features(metrics) -> np.ndarray:
+    """Build the (1, n_features) float32 model input straight from the metrics."""
+    return np.fromiter(
+        (metrics[name] for name in FEATURE_COLUMNS), dtype=np.float32, count=len(FEATURE_COLUMNS)
+    ).reshape(1, -1)
+
+
+def _warm_up(model) -> None:
+    """Run one throwaway prediction so sklearn's lazy imports and dispatch
+    caches are populated before the first real request."""
+    try:
+        model.predict(np.zeros((1, len(FEATURE_COLUMNS)), dtype=np.float32))
+    except Exception:
+        # A malformed model will surface on the real request instead
+        pass
 
 
 @app.route('/', methods=['GET', 'POST'])
@@ -36,16 +226,30 @@ def index():
     if request.method == 'POST':
         uploaded = request.files.get('codefile')
         if uploaded and uploaded.filename:
-            code_text = _read_file_storage_to_text(uploaded)
+            # Nothing to read: answer before hashing, analysis or the model
+            if _upload_is_empty(uploaded):
+                result = {'error': 'The uploaded file is empty.'}
+                return render_template(_INDEX_TEMPLATE, result=result)
+
+            # Fetch the model first: a debug-mode reload also clears the result cache
+            model, model_name = _get_model()
 
-            # 1) Static analysis
-            metrics = analyze_code(code_text)
+            # Identical uploads skip analysis and prediction entirely
+            key = _hash_upload(uploaded)
+            result = _cached_result(key)
+            if result is not None:
+                return render_template(_INDEX_TEMPLATE, result=result)
 
-            # 2) Features and model
-            X = metrics_to_features(metrics)
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            model_path = os.path.join(base_dir, 'model', 'defect_model.pkl')
-            model, model_name = load_or_train_model(model_path)
+            # 1) Static analysis, streamed line by line from the upload
+            metrics = analyze_code_stream(_iter_upload_lines(uploaded))
+
+            # Only blank lines: skip the model entirely
+            if not metrics['loc']:
+                result = {'error': 'The uploaded file contains no code.'}
+                return render_template(_INDEX_TEMPLATE, result=result)
+
+            # 2) Features
+            X = _features(metrics)
 
             # 3) Predict
             y_pred = model.predict(X)[0]
@@ -53,25 +257,48 @@ def index():
 
             result = {
                 'is_defective': is_defective,
-                'metrics_json': json.dumps(metrics, indent=2),
+                'metrics_json': _dumps(metrics),
                 'model_name': model_name,
             }
+            _store_result(key, result)
+
+    return render_template(_INDEX_TEMPLATE, result=result)
+
+
+@app.errorhandler(413)
+def upload_too_large(error):
+    limit_mb = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    result = {'error': f'The uploaded file is too large (limit: {limit_mb} MB).'}
+    return render_template(_INDEX_TEMPLATE, result=result), 413
+
 
-    return render_template('index.html', result=result)
+# Load and warm the model at startup so the first request doesn't pay for it
+_get_model()
 
 
 if __name__ == '__main__':
-    # Run the Flask development server (local only)
+    # Serve with waitress locally; set FLASK_ENV=development for the reloading dev server
     port = int(os.environ.get('PORT', 5000))
     print("\n" + "="*60)
     print("Starting Flask Server...")
     print("="*60)
     print(f"\nServer running at: http://127.0.0.1:{port}")
     print(f"Press Ctrl+C to stop the server\n")
-    app.run(host='127.0.0.1', port=port, debug=True)
+    if os.environ.get('FLASK_ENV') == 'development':
+        app.run(host='127.0.0.1', port=port, debug=True)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            print("Warning: waitress not available, using the Flask development server")
+            app.run(host='127.0.0.1', port=port, threaded=True)
+        else:
+            serve(app, host='127.0.0.1', port=port, threads=8)
 else:
     # Production mode - gunicorn will handle this
     # Ensure app is configured for production
     app.config['DEBUG'] = False
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    app.jinja_env.auto_reload = False
 
 
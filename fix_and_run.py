@@ -5,8 +5,52 @@ Fix pip and install dependencies, then run the server
 import sys
 import os
 import subprocess
+import shutil
+import importlib
+import importlib.util
 import urllib.request
 
+# (import name, pip package) for everything the server needs
+REQUIRED_PACKAGES = [
+    ('flask', 'flask'),
+    ('pandas', 'pandas'),
+    ('sklearn', 'scikit-learn'),
+    ('numpy', 'numpy'),
+    ('waitress', 'waitress'),
+    ('orjson', 'orjson'),
+    ('flask_compress', 'flask-compress'),
+]
+
+# One resolver run, no prompts, and prebuilt wheels over source builds.
+# pip's output is streamed to the console rather than captured, so the user
+# sees progress and long build logs are never buffered in memory.
+PIP_INSTALL_FLAGS = ["--disable-pip-version-check", "--no-input", "--prefer-binary"]
+
+# uv resolves and downloads wheels in parallel; fall back to pip without it
+USE_UV = shutil.which("uv") is not None
+if USE_UV:
+    PIP_INSTALL_CMD = ["uv", "pip", "install", "--python", sys.executable]
+else:
+    PIP_INSTALL_CMD = [sys.executable, "-m", "pip", "install", *PIP_INSTALL_FLAGS]
+
+
+def _pip_version():
+    """Return `pip --version` output, or None if pip is not usable."""
+    try:
+        result = subprocess.run(
+            [sys.executable, "-m", "pip", "--version"],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+    except Exception as e:
+        print(f"  [ERROR] pip check failed: {e}")
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
 # Change to script directory
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
@@ -15,129 +59,123 @@ print("FIXING AND STARTING SERVER")
 print("="*70)
 print()
 
-# Step 1: Fix pip
-print("Step 1: Fixing pip installation...")
-try:
-    # Try ensurepip
-    print("  Trying ensurepip...")
-    result = subprocess.run(
-        [sys.executable, "-m", "ensurepip", "--upgrade"],
-        capture_output=True,
-        text=True,
-        timeout=60
-    )
-    if result.returncode == 0:
-        print("  [OK] ensurepip completed")
+# Fast path: skip pip entirely when every dependency is already importable
+needed = [package for module, package in REQUIRED_PACKAGES
+          if importlib.util.find_spec(module) is None]
+
+if not needed:
+    print("[OK] All dependencies are already installed, skipping setup")
+else:
+    # Step 1: Check pip first; repairing it is slow and usually unnecessary
+    print("Step 1: Verifying pip...")
+    pip_version = _pip_version()
+    pip_works = pip_version is not None
+    if pip_works:
+        print(f"  [OK] pip is working: {pip_version}")
     else:
-        print("  [WARNING] ensurepip had issues, trying get-pip.py...")
-        
-        # Download get-pip.py
+        print("  [ERROR] pip is not working")
+
+    # Step 2: Fix pip only if the check failed
+    if pip_works or USE_UV:
+        print("\nStep 2: SKIPPED - nothing to fix")
+    else:
+        print("\nStep 2: Fixing pip installation...")
         try:
-            print("  Downloading get-pip.py...")
-            urllib.request.urlretrieve(
-                'https://bootstrap.pypa.io/get-pip.py',
-                'get-pip.py'
-            )
-            print("  [OK] Downloaded get-pip.py")
-            
-            # Run get-pip.py
-            print("  Installing pip...")
+            # Try ensurepip
+            print("  Trying ensurepip...")
             result = subprocess.run(
-                [sys.executable, "get-pip.py"],
-                capture_output=True,
-                text=True,
-                timeout=120
+                [sys.executable, "-m", "ensurepip", "--upgrade"],
+                timeout=60
             )
             if result.returncode == 0:
-                print("  [OK] pip installed via get-pip.py")
+                print("  [OK] ensurepip completed")
             else:
-                print("  [WARNING] get-pip.py had issues")
-                print("  Error:", result.stderr[:200] if result.stderr else "Unknown")
+                print("  [WARNING] ensurepip had issues, trying get-pip.py...")
+        
+                # Download get-pip.py
+                try:
+                    print("  Downloading get-pip.py...")
+                    urllib.request.urlretrieve(
+                        'https://bootstrap.pypa.io/get-pip.py',
+                        'get-pip.py'
+                    )
+                    print("  [OK] Downloaded get-pip.py")
+            
+                    # Run get-pip.py
+                    print("  Installing pip...")
+                    result = subprocess.run(
+                        [sys.executable, "get-pip.py"],
+                        timeout=120
+                    )
+                    if result.returncode == 0:
+                        print("  [OK] pip installed via get-pip.py")
+                    else:
+                        print("  [WARNING] get-pip.py had issues (see output above)")
+                except Exception as e:
+                    print(f"  [WARNING] Could not use get-pip.py: {e}")
         except Exception as e:
-            print(f"  [WARNING] Could not use get-pip.py: {e}")
-except Exception as e:
-    print(f"  [WARNING] Error with ensurepip: {e}")
+            print(f"  [WARNING] Error with ensurepip: {e}")
 
-# Step 2: Check if pip works now
-print("\nStep 2: Verifying pip...")
-try:
-    result = subprocess.run(
-        [sys.executable, "-m", "pip", "--version"],
-        capture_output=True,
-        text=True,
-        timeout=10
-    )
-    if result.returncode == 0:
-        print(f"  [OK] pip is working: {result.stdout.strip()}")
-        pip_works = True
-    else:
-        print("  [ERROR] pip is not working")
-        pip_works = False
-except Exception as e:
-    print(f"  [ERROR] pip check failed: {e}")
-    pip_works = False
-
-# Step 3: Install Flask and dependencies
-if pip_works:
-    print("\nStep 3: Installing Flask and dependencies...")
-    packages = ['flask', 'pandas', 'scikit-learn', 'numpy']
-    
-    for package in packages:
-        print(f"  Installing {package}...")
+        pip_version = _pip_version()
+        pip_works = pip_version is not None
+        if pip_works:
+            print(f"  [OK] pip is working: {pip_version}")
+        else:
+            print("  [ERROR] pip is still not working")
+
+    # Step 3: Install Flask and dependencies (uv does not need a working pip)
+    if pip_works or USE_UV:
+        print("\nStep 3: Installing Flask and dependencies...")
+        print(f"  Installing {', '.join(needed)}...")
         try:
             result = subprocess.run(
-                [sys.executable, "-m", "pip", "install", package],
-                capture_output=True,
-                text=True,
-                timeout=300
+                [*PIP_INSTALL_CMD, *needed],
+                timeout=600
             )
             if result.returncode == 0:
-                print(f"  [OK] {package} installed")
+                print("  [OK] All packages installed")
             else:
-                print(f"  [FAILED] {package} installation failed")
-                if result.stderr:
-                    print(f"    Error: {result.stderr[:200]}")
+                print("  [FAILED] Package installation failed (see pip output above)")
         except Exception as e:
-            print(f"  [ERROR] Exception installing {package}: {e}")
-else:
-    print("\nStep 3: SKIPPED - pip is not working")
-    print("\n[CRITICAL] Cannot install packages without pip.")
-    print("\nPlease fix pip manually:")
-    print("  1. Download get-pip.py from: https://bootstrap.pypa.io/get-pip.py")
-    print("  2. Run: python get-pip.py")
-    print("  3. Then run this script again")
-    input("\nPress Enter to exit...")
-    sys.exit(1)
-
-# Step 4: Verify Flask is installed
-print("\nStep 4: Verifying Flask installation...")
-try:
-    import flask
-    print(f"  [OK] Flask is installed (version {flask.__version__})")
-except ImportError:
-    print("  [ERROR] Flask is still not installed!")
-    print("\n[CRITICAL] Flask installation failed.")
-    print("Please install manually:")
-    print("  python -m pip install flask")
-    input("\nPress Enter to exit...")
-    sys.exit(1)
+            print(f"  [ERROR] Exception installing packages: {e}")
+    else:
+        print("\nStep 3: SKIPPED - pip is not working")
+        print("\n[CRITICAL] Cannot install packages without pip.")
+        print("\nPlease fix pip manually:")
+        print("  1. Download get-pip.py from: https://bootstrap.pypa.io/get-pip.py")
+        print("  2. Run: python get-pip.py")
+        print("  3. Then run this script again")
+        input("\nPress Enter to exit...")
+        sys.exit(1)
 
-# Step 5: Check other dependencies
-print("\nStep 5: Checking other dependencies...")
-missing = []
-for pkg in [('pandas', 'pandas'), ('sklearn', 'scikit-learn'), ('numpy', 'numpy')]:
+    # Step 4: Verify Flask is installed
+    print("\nStep 4: Verifying Flask installation...")
     try:
-        __import__(pkg[0])
-        print(f"  [OK] {pkg[1]}")
+        import flask
+        print(f"  [OK] Flask is installed (version {flask.__version__})")
     except ImportError:
-        print(f"  [MISSING] {pkg[1]}")
-        missing.append(pkg[1])
+        print("  [ERROR] Flask is still not installed!")
+        print("\n[CRITICAL] Flask installation failed.")
+        print("Please install manually:")
+        print("  python -m pip install flask")
+        input("\nPress Enter to exit...")
+        sys.exit(1)
 
-if missing:
-    print(f"\n  Installing missing: {', '.join(missing)}...")
-    for pkg in missing:
-        subprocess.run([sys.executable, "-m", "pip", "install", pkg], 
-                      capture_output=True, timeout=300)
+    # Step 5: Check other dependencies
+    print("\nStep 5: Checking other dependencies...")
+    importlib.invalidate_caches()
+    missing = []
+    for module, package in REQUIRED_PACKAGES:
+        if importlib.util.find_spec(module) is not None:
+            print(f"  [OK] {package}")
+        else:
+            print(f"  [MISSING] {package}")
+            missing.append(package)
+
+    if missing:
+        print(f"\n  Installing missing: {', '.join(missing)}...")
+        subprocess.run([*PIP_INSTALL_CMD, *missing],
+                      timeout=600)
 
 # Step 6: Start the server
 print("\n" + "="*70)
@@ -151,8 +189,18 @@ print("="*70)
 print()
 
 try:
-    import app
-    app.app.run(host='127.0.0.1', port=5000, debug=True)
+    # The install above may have failed; fall back to Flask's own server
+    importlib.invalidate_caches()
+    if importlib.util.find_spec("waitress") is not None:
+        subprocess.run(
+            [sys.executable, "-m", "waitress", "--listen=127.0.0.1:5000", "--threads=8", "app:app"],
+            check=True
+        )
+    else:
+        print("  [WARNING] waitress is not installed; using the built-in Flask server")
+        import app
+        # No reloader: it would re-import app.py (and reload the model) in a child process
+        app.app.run(host='127.0.0.1', port=5000, debug=False, use_reloader=False, threaded=True)
 except KeyboardInterrupt:
     print("\n\nServer stopped by user.")
 except Exception as e:
@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for serving the Flask app in production.
+
+Usage:
+    gunicorn -c gunicorn_conf.py app:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Import app.py (and load the model) once in the master process; workers are
+# forked from it and share the model's memory pages copy-on-write
+preload_app = True
+
+# Each worker is a full process holding the model, so default to one per
+# usable core but at most MAX_WORKERS; os.cpu_count() reports the host's cores
+# inside containers. WEB_CONCURRENCY overrides the default.
+MAX_WORKERS = 4
+
+
+def _usable_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # sched_getaffinity is Linux-only
+        return os.cpu_count() or 1
+
+
+workers = int(os.environ.get('WEB_CONCURRENCY', min(MAX_WORKERS, _usable_cpus())))
+
+# With more than one thread gunicorn runs sync workers as gthread, so a slow
+# upload does not block its whole worker
+worker_class = 'sync'
+threads = 4
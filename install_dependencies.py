@@ -3,24 +3,33 @@ Script to install all dependencies from requirements.txt
 """
 
 import subprocess
+import shutil
 import sys
 import os
 
+# No prompts, and prebuilt wheels over multi-minute numpy/scikit-learn source builds.
+# pip's output goes straight to the console instead of being captured in memory.
+PIP_INSTALL_FLAGS = ["--disable-pip-version-check", "--no-input", "--prefer-binary"]
+
+# uv resolves and downloads wheels in parallel; fall back to pip without it
+USE_UV = shutil.which("uv") is not None
+if USE_UV:
+    PIP_INSTALL_CMD = ["uv", "pip", "install", "--python", sys.executable]
+else:
+    PIP_INSTALL_CMD = [sys.executable, "-m", "pip", "install", *PIP_INSTALL_FLAGS]
+
 def install_package(package):
     """Install a single package."""
     try:
         print(f"Installing {package}...")
         result = subprocess.run(
-            [sys.executable, "-m", "pip", "install", package],
-            capture_output=True,
-            text=True
+            [*PIP_INSTALL_CMD, package]
         )
         if result.returncode == 0:
             print(f"[OK] Successfully installed {package}")
             return True
         else:
             print(f"[FAILED] Failed to install {package}")
-            print(f"  Error: {result.stderr}")
             return False
     except Exception as e:
         print(f"[ERROR] Error installing {package}: {e}")
@@ -63,17 +72,13 @@ def main():
     print("Step 3: Attempting to install all packages at once...")
     try:
         result = subprocess.run(
-            [sys.executable, "-m", "pip", "install", "-r", requirements_file],
-            capture_output=True,
-            text=True
+            [*PIP_INSTALL_CMD, "-r", requirements_file]
         )
         if result.returncode == 0:
             print("[OK] All packages installed successfully!")
-            print(result.stdout)
             return
         else:
             print("[FAILED] Batch installation failed, trying individual packages...")
-            print(result.stderr)
     except Exception as e:
         print(f"[ERROR] Batch installation error: {e}")
         print("Trying individual packages...")
@@ -11,22 +11,31 @@ This program:
 """
 
 import os
+import gc
+import hashlib
 import warnings
 import pandas as pd
 import numpy as np
 import joblib
+from joblib import Parallel, delayed
+import matplotlib
+matplotlib.use('Agg')  # figures are only written to files, never shown
 import matplotlib.pyplot as plt
 import seaborn as sns
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import make_pipeline
 from sklearn.linear_model import LogisticRegression
 from sklearn.naive_bayes import GaussianNB
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.svm import SVC
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.svm import SVC, LinearSVC
+from sklearn.calibration import CalibratedClassifierCV
 from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score,
+    precision_score, recall_score, f1_score,
     roc_auc_score, confusion_matrix, classification_report
 )
 
@@ -38,13 +47,187 @@ except ImportError:
     XGBOOST_AVAILABLE = False
     print("Warning: XGBoost not available. Install with: pip install xgboost")
 
+# Try to import FAISS for a SIMD float32 nearest-neighbour search, also optional
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+# Try to import lz4 for fast joblib compression of saved models, also optional
+try:
+    import lz4  # noqa: F401  (used by joblib's 'lz4' compressor)
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
 warnings.filterwarnings('ignore')
 
+# Above this many training samples the RBF-kernel SVC (O(n^2)-O(n^3) plus
+# internal Platt-scaling CV) is replaced by a calibrated linear SVM
+LINEAR_SVM_MIN_SAMPLES = 5000
+
+# Below this many training samples the slow models (SVC with its Platt-scaling
+# CV, gradient boosting) are skipped; they rarely beat the fast ones there
+SMALL_DATASET_SAMPLES = 500
+
+# KNN is skipped on small, wide datasets where distances carry little signal
+KNN_MAX_FEATURES = 50
+KNN_MIN_SAMPLES = 1000
+
+# Split-based models are insensitive to feature scale, so they are fitted on
+# the unscaled matrix instead of going through the scaling pipeline
+TREE_MODELS = {'Decision Tree', 'Random Forest', 'Gradient Boosting', 'XGBoost'}
+
+# Common boolean spellings of a defect label (matched case-insensitively)
+BOOL_TARGET_MAP = {'true': 1, 'false': 0, '1': 1, '0': 0, 'yes': 1, 'no': 0}
+
+# Trees added per warm-start round when growing the random forest
+RF_TREE_BATCH = 25
+
+# Part of the preprocessing cache key; bump whenever preprocess_data() output
+# changes (columns, dtypes, encoding or scaling) so stale caches are rebuilt
+_PREPROCESS_CACHE_VERSION = 1
+
 # Set style for better visualizations
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 
 
+def _fast_cm_binary(y_true, y_pred):
+    """2x2 confusion matrix for 0/1 labels, same layout as confusion_matrix."""
+    return np.bincount(2 * y_true + y_pred, minlength=4).reshape(2, 2)
+
+
+def _fit_eval(model, X_train, y_train, X_test, y_test, binary):
+    """Fit one model and compute its evaluation metrics.
+    
+    Runs inside a joblib worker. Scores for ROC-AUC are only computed when
+    the problem is binary (`binary`), since they are discarded otherwise.
+    Returns (result, None) on success or (None, error message) if fitting
+    or prediction failed.
+    """
+    try:
+        # Train model
+        model.fit(X_train, y_train)
+        
+        # Predictions
+        y_pred = model.predict(X_test)
+        if not binary:
+            y_pred_proba = None
+        elif hasattr(model, 'predict_proba'):
+            y_pred_proba = model.predict_proba(X_test)[:, 1]
+        elif hasattr(model, 'decision_function'):
+            # Ranking scores are all ROC-AUC needs
+            y_pred_proba = model.decision_function(X_test)
+        else:
+            y_pred_proba = None
+        
+        # Calculate metrics
+        accuracy = float((y_pred == y_test).mean())
+        precision = precision_score(y_test, y_pred, average='weighted', zero_division=0)
+        recall = recall_score(y_test, y_pred, average='weighted', zero_division=0)
+        f1 = f1_score(y_test, y_pred, average='weighted', zero_division=0)
+        
+        # ROC-AUC (only if binary classification and scores available)
+        try:
+            if y_pred_proba is not None:
+                roc_auc = roc_auc_score(y_test, y_pred_proba)
+            else:
+                roc_auc = None
+        except:
+            roc_auc = None
+        
+        # Confusion matrix (bincount shortcut for the usual 0/1 defect labels)
+        zero_one = min(y_test.min(), y_pred.min()) >= 0 and max(y_test.max(), y_pred.max()) <= 1
+        if binary and zero_one:
+            cm = _fast_cm_binary(y_test, y_pred)
+        else:
+            cm = confusion_matrix(y_test, y_pred)
+    except Exception as e:
+        return None, str(e)
+    
+    return {
+        'model': model,
+        'accuracy': accuracy,
+        'precision': precision,
+        'recall': recall,
+        'f1_score': f1,
+        'roc_auc': roc_auc,
+        'confusion_matrix': cm,
+        'predictions': y_pred
+    }, None
+
+
+class FaissKNN(BaseEstimator, ClassifierMixin):
+    """k-nearest-neighbours classifier backed by an exact FAISS L2 index.
+    
+    Drop-in replacement for KNeighborsClassifier (uniform weights): features
+    are searched as float32 and neighbours vote on the label.
+    """
+    
+    def __init__(self, n_neighbors: int = 5):
+        self.n_neighbors = n_neighbors
+    
+    def fit(self, X, y):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        self.classes_, self._y_codes = np.unique(y, return_inverse=True)
+        self.index_ = faiss.IndexFlatL2(X.shape[1])
+        self.index_.add(X)
+        return self
+    
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        k = min(self.n_neighbors, self.index_.ntotal)
+        _, neighbors = self.index_.search(X, k)
+        labels = self._y_codes[neighbors]
+        proba = np.zeros((X.shape[0], len(self.classes_)))
+        for code in range(len(self.classes_)):
+            proba[:, code] = (labels == code).sum(axis=1)
+        return proba / k
+    
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+    
+    def __getstate__(self):
+        # FAISS indexes are SWIG objects; serialize them so the fitted model
+        # can cross joblib worker boundaries and be saved with joblib.dump
+        state = self.__dict__.copy()
+        if 'index_' in state:
+            state['index_'] = faiss.serialize_index(state['index_'])
+        return state
+    
+    def __setstate__(self, state):
+        if 'index_' in state:
+            state['index_'] = faiss.deserialize_index(state['index_'])
+        self.__dict__.update(state)
+
+
+class BatchedRandomForestClassifier(RandomForestClassifier):
+    """RandomForestClassifier that grows its trees in warm-start batches.
+    
+    Fitting RF_TREE_BATCH trees at a time and collecting garbage between
+    rounds keeps the per-round scratch memory from piling up. With an int
+    random_state the resulting forest is identical to a single fit.
+    """
+    
+    def fit(self, X, y, sample_weight=None):
+        n_total, warm_start = self.n_estimators, self.warm_start
+        if not warm_start and hasattr(self, 'estimators_'):
+            del self.estimators_
+        self.warm_start = True
+        try:
+            n_trees = 0
+            while n_trees < n_total:
+                n_trees = min(n_trees + RF_TREE_BATCH, n_total)
+                self.n_estimators = n_trees
+                super().fit(X, y, sample_weight=sample_weight)
+                gc.collect()
+        finally:
+            self.n_estimators, self.warm_start = n_total, warm_start
+        return self
+
+
 class SoftwareDefectDetector:
     """Main class for software defect detection using multiple ML models."""
     
@@ -58,10 +241,12 @@ class SoftwareDefectDetector:
         """
         self.dataset_path = dataset_path
         self.target_column = target_column
-        self.scaler = StandardScaler()
+        self.n_numeric = 0
         self.label_encoder = LabelEncoder()
+        self.category_levels = {}
         self.models = {}
         self.results = {}
+        self._metrics_df = None
         self.best_model = None
         self.best_model_name = None
         self.best_score = 0
@@ -73,7 +258,12 @@ class SoftwareDefectDetector:
         print(f"{'='*60}")
         
         try:
-            df = pd.read_csv(self.dataset_path)
+            try:
+                # Multi-threaded Arrow parser; keeps integer columns as integers
+                df = pd.read_csv(self.dataset_path, engine='pyarrow', dtype_backend='pyarrow')
+            except (ImportError, TypeError):
+                # pyarrow not installed, or pandas < 2.0 without dtype_backend
+                df = pd.read_csv(self.dataset_path)
             print(f"Dataset loaded successfully!")
             print(f"Shape: {df.shape[0]} rows, {df.shape[1]} columns")
             print(f"\nFirst few rows:")
@@ -84,6 +274,60 @@ class SoftwareDefectDetector:
         except Exception as e:
             raise Exception(f"Error loading dataset: {str(e)}")
     
+    def _cache_key(self) -> str:
+        """Key for the preprocessing cache, derived from the dataset's path, mtime and size
+        and the preprocessing format version."""
+        stat = os.stat(self.dataset_path)
+        raw = (f"{_PREPROCESS_CACHE_VERSION}:{os.path.abspath(self.dataset_path)}"
+               f"{stat.st_mtime}{stat.st_size}{self.target_column}")
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+    
+    def load_preprocessed(self, cache_dir: str = '.cache') -> tuple:
+        """
+        Load and preprocess the dataset, reusing cached arrays if the file is unchanged.
+        
+        On a cache miss this runs load_data() and preprocess_data() and stores
+        the resulting arrays (npz) plus the fitted encoders (joblib)
+        under cache_dir, keyed by the dataset's path, mtime and size.
+        
+        Returns:
+            Same (X, y, feature_names) tuple as preprocess_data()
+        """
+        key = self._cache_key()
+        arrays_path = os.path.join(cache_dir, f"{key}.npz")
+        state_path = os.path.join(cache_dir, f"{key}.joblib")
+        
+        if os.path.exists(arrays_path) and os.path.exists(state_path):
+            try:
+                with np.load(arrays_path, allow_pickle=False) as cached:
+                    X, y = cached['X'], cached['y']
+                    feature_names = cached['feature_names'].tolist()
+                state = joblib.load(state_path)
+                self.n_numeric = state['n_numeric']
+                self.label_encoder = state['label_encoder']
+                self.category_levels = state['category_levels']
+                print(f"\nLoaded preprocessed data from cache: {arrays_path}")
+                print(f"   Final feature shape: {X.shape}")
+                return X, y, feature_names
+            except Exception as e:
+                print(f"\nWarning: Could not read preprocessing cache ({e}), rebuilding...")
+        
+        df = self.load_data()
+        X, y, feature_names = self.preprocess_data(df)
+        
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.savez(arrays_path, X=X, y=y, feature_names=np.array(feature_names, dtype=str))
+            joblib.dump({
+                'n_numeric': self.n_numeric,
+                'label_encoder': self.label_encoder,
+                'category_levels': self.category_levels,
+            }, state_path)
+        except Exception as e:
+            print(f"Warning: Could not write preprocessing cache: {e}")
+        
+        return X, y, feature_names
+    
     def detect_target_column(self, df: pd.DataFrame) -> str:
         """Auto-detect the target column name."""
         # Common target column names
@@ -106,6 +350,9 @@ class SoftwareDefectDetector:
         """
         Preprocess the dataset.
         
+        Features are returned unscaled, numeric columns first; scaling is
+        fitted on the training split only, see build_preprocessor().
+        
         Returns:
             X: Features (numpy array)
             y: Target labels (numpy array)
@@ -119,9 +366,10 @@ class SoftwareDefectDetector:
         target_col = self.detect_target_column(df)
         print(f"Target column: {target_col}")
         
-        # Separate features and target
-        X = df.drop(columns=[target_col]).copy()
-        y = df[target_col].copy()
+        # Separate features and target (drop already returns a new frame and
+        # neither is modified in place, so no defensive copies)
+        X = df.drop(columns=[target_col])
+        y = df[target_col]
         
         print(f"\nOriginal data shape: {X.shape}")
         print(f"Target distribution:\n{y.value_counts()}")
@@ -131,45 +379,61 @@ class SoftwareDefectDetector:
         missing_before = X.isnull().sum().sum()
         if missing_before > 0:
             print(f"   Found {missing_before} missing values")
-            # Fill numeric columns with median
             numeric_cols = X.select_dtypes(include=[np.number]).columns
-            for col in numeric_cols:
-                X[col].fillna(X[col].median(), inplace=True)
-            # Fill categorical columns with mode
-            categorical_cols = X.select_dtypes(include=['object']).columns
-            for col in categorical_cols:
-                X[col].fillna(X[col].mode()[0] if len(X[col].mode()) > 0 else 'unknown', inplace=True)
+            categorical_cols = X.columns.difference(numeric_cols, sort=False)
+            # Numeric columns get their median, categorical ones their mode,
+            # each computed for all columns at once and applied in one fillna
+            fill_values = X[numeric_cols].median()
+            if len(categorical_cols) > 0:
+                modes = X[categorical_cols].mode()
+                if len(modes) > 0:
+                    fill_values = pd.concat([fill_values, modes.iloc[0].fillna('unknown')])
+                else:
+                    fill_values = pd.concat([fill_values, pd.Series('unknown', index=categorical_cols)])
+            X = X.fillna(fill_values)
             print(f"   Missing values filled")
         else:
             print(f"   No missing values found")
         
         # Encode categorical features
         print(f"\n2. Encoding categorical features...")
-        categorical_cols = X.select_dtypes(include=['object', 'bool']).columns.tolist()
-        feature_names = []
-        
-        for col in X.columns:
-            if col in categorical_cols:
-                # One-hot encode categorical columns
-                dummies = pd.get_dummies(X[col], prefix=col, drop_first=True)
-                X = pd.concat([X.drop(columns=[col]), dummies], axis=1)
-                feature_names.extend(dummies.columns.tolist())
-                print(f"   Encoded '{col}' -> {len(dummies.columns)} binary features")
-            else:
-                feature_names.append(col)
+        numeric_cols = X.select_dtypes(include=[np.number]).columns.tolist()
+        categorical_cols = X.columns.difference(numeric_cols, sort=False).tolist()
+        feature_names = list(numeric_cols)
+        blocks = [X[numeric_cols].to_numpy(dtype=np.float32, copy=False)]
+        self.category_levels = {}
+        
+        for col in categorical_cols:
+            # One-hot encode as int8, dropping the first (sorted) level like
+            # get_dummies(drop_first=True); missing values encode as all zeros
+            codes, levels = pd.factorize(X[col], sort=True)
+            self.category_levels[col] = levels
+            onehot = (codes[:, None] == np.arange(1, len(levels))).astype(np.int8)
+            blocks.append(onehot)
+            feature_names.extend(f"{col}_{level}" for level in levels[1:])
+            print(f"   Encoded '{col}' -> {onehot.shape[1]} binary features")
+        
+        # Assemble the feature matrix once instead of re-concatenating per column
+        X = np.concatenate(blocks, axis=1)
+        self.n_numeric = len(numeric_cols)
         
         # Encode target variable if needed
         print(f"\n3. Encoding target variable...")
-        if y.dtype == 'object' or y.dtype == 'bool':
+        # dtype predicates rather than == 'object'/'bool', which miss string
+        # and Arrow-backed dtypes
+        if not pd.api.types.is_numeric_dtype(y) or pd.api.types.is_bool_dtype(y):
             # Convert boolean/string to numeric
-            if y.dtype == 'bool':
+            if pd.api.types.is_bool_dtype(y):
                 y = y.astype(int)
             else:
-                # Handle string booleans (true/false, True/False)
-                y_str = y.astype(str).str.lower()
-                if set(y_str.unique()).issubset({'true', 'false', '1', '0', 'yes', 'no'}):
-                    # Map common boolean strings
-                    y = y_str.map({'true': 1, 'false': 0, '1': 1, '0': 0, 'yes': 1, 'no': 0}).astype(int)
+                # Handle string booleans (true/false, True/False). Only the
+                # distinct values are lowercased and looked up; rows are then
+                # mapped through an int8 lookup table by category code
+                cat = pd.Categorical(y.astype(str))
+                levels = cat.categories.str.lower()
+                if levels.isin(list(BOOL_TARGET_MAP)).all():
+                    lut = np.array([BOOL_TARGET_MAP[level] for level in levels], dtype=np.int8)
+                    y = lut[cat.codes]
                 else:
                     # Use label encoder for other categorical values
                     y = self.label_encoder.fit_transform(y)
@@ -178,18 +442,38 @@ class SoftwareDefectDetector:
             y = y.astype(int)
             print(f"   Target already numeric: {np.unique(y)}")
         
-        # Normalize/scale numeric features
-        print(f"\n4. Normalizing numeric features...")
-        X_scaled = self.scaler.fit_transform(X)
-        X_scaled = pd.DataFrame(X_scaled, columns=feature_names)
+        # float32 halves the memory traffic of the distance/dot-product models
+        X = X.astype(np.float32, copy=False)
+        print(f"\n   Final feature shape: {X.shape}")
         
-        print(f"   Features normalized using StandardScaler")
-        print(f"   Final feature shape: {X_scaled.shape}")
+        return X, np.asarray(y, dtype=np.int32), feature_names
+    
+    def build_preprocessor(self) -> ColumnTransformer:
+        """Build the (unfitted) scaling step put in front of non-tree models.
         
-        return X_scaled.values, y.values, feature_names
+        Only the numeric block is standardized; the one-hot columns pass
+        through unchanged. Fitting it inside each model's pipeline keeps
+        test-set statistics out of the scaler.
+        
+        The numeric columns are selected by index list, which hands the
+        scaler a fresh copy rather than a view of the caller's matrix, so
+        it can safely scale in place (copy=False).
+        """
+        return ColumnTransformer(
+            [('num', StandardScaler(copy=False), list(range(self.n_numeric)))],
+            remainder='passthrough'
+        )
     
-    def initialize_models(self):
-        """Initialize all ML models."""
+    def initialize_models(self, n_train: int = None, n_features: int = None):
+        """Initialize all ML models.
+        
+        Args:
+            n_train: Number of training samples, used to pick an SVM variant
+                that scales to the dataset and to skip slow models on small
+                ones (unknown if None)
+            n_features: Number of features, used to skip KNN on small, wide
+                datasets (unknown if None)
+        """
         print(f"\n{'='*60}")
         print("INITIALIZING MODELS")
         print(f"{'='*60}")
@@ -197,13 +481,30 @@ class SoftwareDefectDetector:
         self.models = {
             'Logistic Regression': LogisticRegression(random_state=42, max_iter=1000),
             'Naive Bayes': GaussianNB(),
-            'KNN': KNeighborsClassifier(n_neighbors=5),
+            'KNN': FaissKNN(n_neighbors=5) if FAISS_AVAILABLE else KNeighborsClassifier(n_neighbors=5),
             'Decision Tree': DecisionTreeClassifier(random_state=42, max_depth=10),
-            'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1),
-            'Gradient Boosting': GradientBoostingClassifier(n_estimators=100, random_state=42),
+            'Random Forest': BatchedRandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1),
+            'Gradient Boosting': HistGradientBoostingClassifier(max_iter=100, random_state=42, early_stopping=True),
             'SVM': SVC(probability=True, random_state=42, kernel='rbf')
         }
         
+        if n_train is not None and n_train > LINEAR_SVM_MIN_SAMPLES:
+            # Still exposes predict_proba, so ROC-AUC keeps working
+            self.models['SVM'] = CalibratedClassifierCV(
+                LinearSVC(dual=False, random_state=42), method='sigmoid', cv=3
+            )
+            print(f"   SVM: using calibrated LinearSVC ({n_train} training samples)")
+        
+        if n_train is not None and n_train < SMALL_DATASET_SAMPLES:
+            del self.models['SVM']
+            del self.models['Gradient Boosting']
+            print(f"   SVM and Gradient Boosting skipped (only {n_train} training samples)")
+        
+        if (n_train is not None and n_features is not None
+                and n_features > KNN_MAX_FEATURES and n_train < KNN_MIN_SAMPLES):
+            del self.models['KNN']
+            print(f"   KNN skipped ({n_features} features, {n_train} training samples)")
+        
         # Add XGBoost if available
         if XGBOOST_AVAILABLE:
             self.models['XGBoost'] = xgb.XGBClassifier(
@@ -220,72 +521,74 @@ class SoftwareDefectDetector:
             print(f"   - {name}")
     
     def train_and_evaluate(self, X_train, X_test, y_train, y_test):
-        """Train all models and evaluate their performance."""
+        """Train all models and evaluate their performance.
+        
+        Models are independent, so they are fitted in parallel worker
+        processes, one model per worker. Non-tree models are wrapped in a
+        pipeline with the scaling step, so the stored models take raw
+        features.
+        """
         print(f"\n{'='*60}")
         print("TRAINING AND EVALUATING MODELS")
         print(f"{'='*60}")
         
         self.results = {}
         
+        # Each worker already owns a core, so estimators must not spawn their own
+        jobs = []
         for name, model in self.models.items():
+            model = clone(model)
+            if 'n_jobs' in model.get_params():
+                model.set_params(n_jobs=1)
+            if name not in TREE_MODELS:
+                model = make_pipeline(self.build_preprocessor(), model)
+            jobs.append((name, model))
+        
+        binary = len(np.unique(y_test)) == 2
+        n_jobs = min(len(jobs), os.cpu_count() or 1)
+        print(f"\nTraining {len(jobs)} models on {n_jobs} worker(s)...")
+        outcomes = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(_fit_eval)(model, X_train, y_train, X_test, y_test, binary)
+            for _, model in jobs
+        )
+        
+        for (name, _), (result, error) in zip(jobs, outcomes):
             print(f"\n{'─'*60}")
             print(f"Training: {name}")
             print(f"{'─'*60}")
             
-            try:
-                # Train model
-                model.fit(X_train, y_train)
-                
-                # Predictions
-                y_pred = model.predict(X_test)
-                y_pred_proba = model.predict_proba(X_test)[:, 1] if hasattr(model, 'predict_proba') else None
-                
-                # Calculate metrics
-                accuracy = accuracy_score(y_test, y_pred)
-                precision = precision_score(y_test, y_pred, average='weighted', zero_division=0)
-                recall = recall_score(y_test, y_pred, average='weighted', zero_division=0)
-                f1 = f1_score(y_test, y_pred, average='weighted', zero_division=0)
-                
-                # ROC-AUC (only if binary classification and probabilities available)
-                try:
-                    if y_pred_proba is not None and len(np.unique(y_test)) == 2:
-                        roc_auc = roc_auc_score(y_test, y_pred_proba)
-                    else:
-                        roc_auc = None
-                except:
-                    roc_auc = None
-                
-                # Confusion matrix
-                cm = confusion_matrix(y_test, y_pred)
-                
-                # Store results
-                self.results[name] = {
-                    'model': model,
-                    'accuracy': accuracy,
-                    'precision': precision,
-                    'recall': recall,
-                    'f1_score': f1,
-                    'roc_auc': roc_auc,
-                    'confusion_matrix': cm,
-                    'predictions': y_pred
-                }
-                
-                # Update best model (based on F1 score)
-                if f1 > self.best_score:
-                    self.best_score = f1
-                    self.best_model = model
-                    self.best_model_name = name
-                
-                print(f"   [OK] Accuracy:  {accuracy:.4f}")
-                print(f"   [OK] Precision: {precision:.4f}")
-                print(f"   [OK] Recall:    {recall:.4f}")
-                print(f"   [OK] F1 Score:  {f1:.4f}")
-                if roc_auc is not None:
-                    print(f"   [OK] ROC-AUC:   {roc_auc:.4f}")
-                
-            except Exception as e:
-                print(f"   [ERROR] Error training {name}: {str(e)}")
+            if error is not None:
+                print(f"   [ERROR] Error training {name}: {error}")
                 continue
+            
+            self.models[name] = result['model']
+            self.results[name] = result
+            
+            # Update best model (based on F1 score)
+            if result['f1_score'] > self.best_score:
+                self.best_score = result['f1_score']
+                self.best_model = result['model']
+                self.best_model_name = name
+            
+            print(f"   [OK] Accuracy:  {result['accuracy']:.4f}")
+            print(f"   [OK] Precision: {result['precision']:.4f}")
+            print(f"   [OK] Recall:    {result['recall']:.4f}")
+            print(f"   [OK] F1 Score:  {result['f1_score']:.4f}")
+            if result['roc_auc'] is not None:
+                print(f"   [OK] ROC-AUC:   {result['roc_auc']:.4f}")
+        
+        # Metric table shared by the results printout and the plots
+        self._metrics_df = pd.DataFrame(
+            {
+                'Accuracy': [r['accuracy'] for r in self.results.values()],
+                'Precision': [r['precision'] for r in self.results.values()],
+                'Recall': [r['recall'] for r in self.results.values()],
+                'F1 Score': [r['f1_score'] for r in self.results.values()],
+                'ROC-AUC': [r['roc_auc'] for r in self.results.values()],
+            },
+            index=pd.Index(list(self.results), name='Model'),
+            dtype=float
+        )
         
         print(f"\n{'='*60}")
         print("TRAINING COMPLETE")
@@ -297,21 +600,9 @@ class SoftwareDefectDetector:
         print("MODEL PERFORMANCE COMPARISON")
         print(f"{'='*80}")
         
-        # Create results DataFrame
-        data = []
-        for name, metrics in self.results.items():
-            row = {
-                'Model': name,
-                'Accuracy': f"{metrics['accuracy']:.4f}",
-                'Precision': f"{metrics['precision']:.4f}",
-                'Recall': f"{metrics['recall']:.4f}",
-                'F1 Score': f"{metrics['f1_score']:.4f}",
-                'ROC-AUC': f"{metrics['roc_auc']:.4f}" if metrics['roc_auc'] is not None else "N/A"
-            }
-            data.append(row)
-        
-        df_results = pd.DataFrame(data)
-        print("\n" + df_results.to_string(index=False))
+        print("\n" + self._metrics_df.reset_index().to_string(
+            index=False, float_format='{:.4f}'.format, na_rep='N/A'
+        ))
         
         # Print confusion matrices
         print(f"\n{'='*80}")
@@ -332,44 +623,26 @@ class SoftwareDefectDetector:
             print("No results to visualize.")
             return
         
-        # Prepare data for plotting
-        models = list(self.results.keys())
-        accuracies = [self.results[m]['accuracy'] for m in models]
-        f1_scores = [self.results[m]['f1_score'] for m in models]
-        precisions = [self.results[m]['precision'] for m in models]
-        recalls = [self.results[m]['recall'] for m in models]
+        # Prepare data for plotting: one row per model, one column per metric
+        models = self._metrics_df.index.tolist()
+        panels = [
+            ('Accuracy', 'steelblue'),
+            ('F1 Score', 'coral'),
+            ('Precision', 'mediumseagreen'),
+            ('Recall', 'gold'),
+        ]
+        metrics_arr = self._metrics_df[[label for label, _ in panels]].to_numpy()
         
         # Create figure with subplots
         fig, axes = plt.subplots(2, 2, figsize=(15, 12))
         fig.suptitle('Model Performance Comparison', fontsize=16, fontweight='bold')
         
-        # Accuracy comparison
-        axes[0, 0].barh(models, accuracies, color='steelblue')
-        axes[0, 0].set_xlabel('Accuracy', fontsize=12)
-        axes[0, 0].set_title('Accuracy Comparison', fontsize=14, fontweight='bold')
-        axes[0, 0].set_xlim([0, 1])
-        axes[0, 0].grid(axis='x', alpha=0.3)
-        
-        # F1 Score comparison
-        axes[0, 1].barh(models, f1_scores, color='coral')
-        axes[0, 1].set_xlabel('F1 Score', fontsize=12)
-        axes[0, 1].set_title('F1 Score Comparison', fontsize=14, fontweight='bold')
-        axes[0, 1].set_xlim([0, 1])
-        axes[0, 1].grid(axis='x', alpha=0.3)
-        
-        # Precision comparison
-        axes[1, 0].barh(models, precisions, color='mediumseagreen')
-        axes[1, 0].set_xlabel('Precision', fontsize=12)
-        axes[1, 0].set_title('Precision Comparison', fontsize=14, fontweight='bold')
-        axes[1, 0].set_xlim([0, 1])
-        axes[1, 0].grid(axis='x', alpha=0.3)
-        
-        # Recall comparison
-        axes[1, 1].barh(models, recalls, color='gold')
-        axes[1, 1].set_xlabel('Recall', fontsize=12)
-        axes[1, 1].set_title('Recall Comparison', fontsize=14, fontweight='bold')
-        axes[1, 1].set_xlim([0, 1])
-        axes[1, 1].grid(axis='x', alpha=0.3)
+        for i, (ax, (label, color)) in enumerate(zip(axes.ravel(), panels)):
+            ax.barh(models, metrics_arr[:, i], color=color)
+            ax.set_xlabel(label, fontsize=12)
+            ax.set_title(f'{label} Comparison', fontsize=14, fontweight='bold')
+            ax.set_xlim([0, 1])
+            ax.grid(axis='x', alpha=0.3)
         
         plt.tight_layout()
         
@@ -395,16 +668,18 @@ class SoftwareDefectDetector:
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(save_path) if os.path.dirname(save_path) else '.', exist_ok=True)
         
-        # Save model, scaler, and metadata
+        # Save model and metadata (scaling, if any, is part of the model pipeline)
         model_data = {
             'model': self.best_model,
-            'scaler': self.scaler,
             'label_encoder': self.label_encoder,
             'model_name': self.best_model_name,
             'metrics': self.results[self.best_model_name]
         }
         
-        joblib.dump(model_data, save_path)
+        # lz4 level 1 shrinks forests several-fold at almost no load cost;
+        # zlib level 3 is the fallback when lz4 is not installed
+        compress = ('lz4', 1) if LZ4_AVAILABLE else 3
+        joblib.dump(model_data, save_path, compress=compress, protocol=5)
         print(f"\n{'='*60}")
         print(f"BEST MODEL SAVED")
         print(f"{'='*60}")
@@ -463,11 +738,8 @@ def main():
     # Initialize detector
     detector = SoftwareDefectDetector(dataset_path)
     
-    # Load data
-    df = detector.load_data()
-    
-    # Preprocess data
-    X, y, feature_names = detector.preprocess_data(df)
+    # Load and preprocess data (cached between runs while the CSV is unchanged)
+    X, y, feature_names = detector.load_preprocessed()
     
     # Split data (80/20)
     print(f"\n{'='*60}")
@@ -475,10 +747,9 @@ def main():
     print(f"{'='*60}")
     
     # Use stratify only if we have enough samples per class
-    unique_labels = np.unique(y)
+    unique_labels, label_counts = np.unique(y, return_counts=True)
     if len(unique_labels) >= 2:
-        value_counts = pd.Series(y).value_counts()
-        can_stratify = len(y) >= 20 and len(value_counts) >= 2 and all(value_counts >= 2)
+        can_stratify = len(y) >= 20 and bool((label_counts >= 2).all())
         stratify_param = y if can_stratify else None
         if stratify_param is None:
             print("Warning: Using non-stratified split (dataset too small or imbalanced)")
@@ -501,7 +772,8 @@ def main():
     print(f"Test set: {X_test.shape[0]} samples")
     
     # Initialize models
-    detector.initialize_models()
+    n_train, n_features = X_train.shape
+    detector.initialize_models(n_train=n_train, n_features=n_features)
     
     # Train and evaluate
     detector.train_and_evaluate(X_train, X_test, y_train, y_test)
@@ -25,13 +25,13 @@ def _map_promise_to_features(df: pd.DataFrame) -> pd.DataFrame:
       - num_functions and num_todos are not present; set to 0.0 as placeholders.
       - avg_line_length approximated by n / max(loc, 1).
     """
-    df_local = df.copy()
+    df_local = df  # read-only below; the label is kept out of the frame
 
     # Normalize label
     if "defects" in df_local.columns:
-        df_local["label"] = df_local["defects"].astype(str).str.lower().map({"true": 1, "false": 0})
+        label = df_local["defects"].astype(str).str.lower().map({"true": 1, "false": 0})
     elif "label" in df_local.columns:
-        df_local["label"] = df_local["label"].astype(int)
+        label = df_local["label"].astype(int)
     else:
         raise ValueError("PROMISE dataset missing 'defects' or 'label' column")
 
@@ -64,7 +64,7 @@ def _map_promise_to_features(df: pd.DataFrame) -> pd.DataFrame:
         "cyclomatic_complexity_estimate": v_g.astype(float),
         "avg_line_length": avg_line_length.astype(float),
         "num_todos": 0.0,  # placeholder, not in PROMISE
-        "label": df_local["label"].astype(int),
+        "label": label.astype(int),
     })
 
     # Ensure column order
@@ -2,38 +2,49 @@
 Script to install dependencies and start the Flask server
 """
 
+import importlib.util
 import subprocess
+import shutil
 import sys
 import os
 
-def install_package(package):
-    """Install a package using pip."""
+# Skip pip's version check, prompts and source builds
+PIP_INSTALL_FLAGS = ["--disable-pip-version-check", "--no-input", "--prefer-binary"]
+
+def install_packages(packages):
+    """Install packages with a single pip invocation."""
     try:
-        print(f"Installing {package}...")
+        print(f"Installing {', '.join(packages)}...")
         result = subprocess.run(
-            [sys.executable, "-m", "pip", "install", package],
+            [sys.executable, "-m", "pip", "install", *PIP_INSTALL_FLAGS, *packages],
             capture_output=True,
             text=True,
-            timeout=300
+            timeout=600
         )
         if result.returncode == 0:
-            print(f"[OK] {package} installed successfully")
+            print(f"[OK] Installed {len(packages)} package(s) successfully")
             return True
         else:
-            print(f"[FAILED] Could not install {package}")
+            print(f"[FAILED] Could not install {', '.join(packages)}")
             if result.stderr:
                 print(f"Error: {result.stderr[:200]}")
             return False
     except subprocess.TimeoutExpired:
-        print(f"[TIMEOUT] Installation of {package} took too long")
+        print("[TIMEOUT] Installation took too long")
         return False
     except Exception as e:
-        print(f"[ERROR] Error installing {package}: {e}")
+        print(f"[ERROR] Error installing packages: {e}")
         return False
 
 def check_and_install_dependencies():
     """Check and install required packages."""
-    required_packages = ['flask', 'pandas', 'scikit-learn', 'numpy']
+    # pip distribution name -> top-level import name
+    required_packages = {
+        'flask': 'flask',
+        'pandas': 'pandas',
+        'scikit-learn': 'sklearn',
+        'numpy': 'numpy',
+    }
     
     print("="*60)
     print("Checking Dependencies")
@@ -42,11 +53,11 @@ def check_and_install_dependencies():
     
     missing_packages = []
     
-    for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
+    for package, module in required_packages.items():
+        # find_spec locates the package without executing its import
+        if importlib.util.find_spec(module) is not None:
             print(f"[OK] {package} is installed")
-        except ImportError:
+        else:
             print(f"[MISSING] {package} is not installed")
             missing_packages.append(package)
     
@@ -64,32 +75,41 @@ def check_and_install_dependencies():
     except:
         pass
     
-    success_count = 0
-    for package in missing_packages:
-        if install_package(package):
-            success_count += 1
-        print()
-    
-    if success_count == len(missing_packages):
-        print("All packages installed successfully!")
+    if install_packages(missing_packages):
+        print("\nAll packages installed successfully!")
         return True
     else:
-        print(f"Warning: Only {success_count}/{len(missing_packages)} packages installed")
+        print("\nWarning: The missing packages could not be installed")
         print("The server may not work properly if critical packages are missing.")
-        return success_count > 0
+        return False
 
 def start_flask_server():
-    """Start the Flask server."""
+    """Start the Flask server.
+    
+    Uses gunicorn with gunicorn_conf.py (one preloaded worker per core, up
+    to four) when it is available; gunicorn does not run on Windows, where
+    the built-in Flask server is used instead.
+    """
     print("\n" + "="*60)
     print("Starting Flask Server")
     print("="*60)
     print()
     
+    if os.name != 'nt' and shutil.which('gunicorn'):
+        print("Server starting at: http://127.0.0.1:5000")
+        print("Press Ctrl+C to stop the server\n")
+        try:
+            subprocess.run(['gunicorn', '-c', 'gunicorn_conf.py', '--bind', '127.0.0.1:5000', 'app:app'])
+        except KeyboardInterrupt:
+            print("\n\nServer stopped by user.")
+        return True
+    
     try:
         import app
         print("Server starting at: http://127.0.0.1:5000")
         print("Press Ctrl+C to stop the server\n")
-        app.app.run(host='127.0.0.1', port=5000, debug=True)
+        # No reloader: it would re-import app.py (and reload the model) in a child process
+        app.app.run(host='127.0.0.1', port=5000, debug=False, use_reloader=False, threaded=True)
     except KeyboardInterrupt:
         print("\n\nServer stopped by user.")
     except ImportError as e:
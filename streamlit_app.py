@@ -9,7 +9,7 @@ import json
 import pandas as pd
 
 from utils.static_analysis import analyze_code
-from utils.feature_extract import metrics_to_features, load_or_train_model
+from utils.feature_extract import metrics_to_features, load_or_train_model, fast_predictor
 
 # Page configuration
 st.set_page_config(
@@ -68,11 +68,58 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def run_analysis(code_text: str, model_key: str, _model) -> dict:
+    """Run static analysis and prediction, memoized on the code text.
+
+    ``_model`` is skipped by Streamlit's hasher; ``model_key`` (see
+    _model_key) keeps cached results from leaking across models, including
+    a retrained defect_model.pkl.
+    """
+    # 1) Static analysis
+    metrics = analyze_code(code_text)
+
+    # 2) Features
+    X = metrics_to_features(metrics)
+
+    # 3) Predict
+    y_pred = _model.predict(X)[0]
+    is_defective = bool(int(y_pred))
+
+    # Get prediction probability if available
+    try:
+        y_proba = _model.predict_proba(X)[0]
+        confidence = max(y_proba) * 100
+    except:
+        confidence = None
+
+    return {
+        'is_defective': is_defective,
+        'metrics': metrics,
+        'confidence': confidence,
+    }
+
+
+def _model_key(model_name: str, model_path: str) -> str:
+    """Identify the loaded model by its name plus the mtime and size of the
+    model files on disk, so retraining invalidates cached results."""
+    parts = [model_name]
+    for path in (model_path, os.path.splitext(model_path)[0] + '.onnx'):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        parts.append(f"{os.path.basename(path)}:{stat.st_mtime_ns}:{stat.st_size}")
+    return "|".join(parts)
+
+
 # Initialize session state
 if 'model' not in st.session_state:
     base_dir = os.path.dirname(os.path.abspath(__file__))
     model_path = os.path.join(base_dir, 'model', 'defect_model.pkl')
-    st.session_state.model, st.session_state.model_name = load_or_train_model(model_path)
+    model, st.session_state.model_name = load_or_train_model(model_path)
+    st.session_state.model_key = _model_key(st.session_state.model_name, model_path)
+    st.session_state.model = fast_predictor(model)
 
 # Main header
 st.markdown('<h1 class="main-header">🐛 Software Defects Detection System</h1>', unsafe_allow_html=True)
@@ -126,10 +173,7 @@ with col1:
     
     if uploaded_file is not None:
         # Read file content
-        try:
-            code_text = str(uploaded_file.read(), "utf-8")
-        except UnicodeDecodeError:
-            code_text = str(uploaded_file.read(), "latin-1", errors="ignore")
+        code_text = uploaded_file.getvalue().decode("utf-8", errors="replace")
         
         st.success(f"✅ File uploaded: **{uploaded_file.name}**")
         
@@ -140,29 +184,13 @@ with col1:
         # Analyze button
         if st.button("🔍 Analyze Code", use_container_width=True):
             with st.spinner("Analyzing code and running ML prediction..."):
-                # 1) Static analysis
-                metrics = analyze_code(code_text)
-                
-                # 2) Features and model
-                X = metrics_to_features(metrics)
-                model = st.session_state.model
-                
-                # 3) Predict
-                y_pred = model.predict(X)[0]
-                is_defective = bool(int(y_pred))
-                
-                # Get prediction probability if available
-                try:
-                    y_proba = model.predict_proba(X)[0]
-                    confidence = max(y_proba) * 100
-                except:
-                    confidence = None
+                analysis = run_analysis(
+                    code_text, st.session_state.model_key, st.session_state.model
+                )
                 
                 # Store results in session state
                 st.session_state.result = {
-                    'is_defective': is_defective,
-                    'metrics': metrics,
-                    'confidence': confidence,
+                    **analysis,
                     'filename': uploaded_file.name
                 }
                 
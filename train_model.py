@@ -1,24 +1,135 @@
 """Train an ML model for software defect detection using a sample dataset.
 
-This script reads `datasets/sample.csv`, trains a RandomForest classifier on
-static-analysis-like features, evaluates accuracy with a hold-out split, and
-saves the trained model to `model/defect_model.pkl`.
+This script reads `datasets/sample.csv`, trains a histogram gradient boosting
+classifier on static-analysis-like features, evaluates accuracy with a hold-out
+split, and saves the trained model to `model/defect_model.pkl` with joblib.
+
+Pass `--model random_forest` or `--model extra_trees` to train a RandomForest
+or ExtraTrees model instead.
+If skl2onnx is installed the model is also exported to `model/defect_model.onnx`,
+which the apps load with onnxruntime when it is available.
+Pass `--treelite` to also compile the model to `model/defect_model.so`, which
+app.py prefers for prediction when tl2cgen is installed.
 """
 
 import os
 import sys
-import pickle
+import json
+import argparse
 from typing import Tuple
 
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
+import joblib
+from threadpoolctl import threadpool_limits
+from sklearn.base import ClassifierMixin
+from sklearn.ensemble import (
+    RandomForestClassifier, ExtraTreesClassifier, HistGradientBoostingClassifier
+)
+from sklearn.metrics import classification_report
 
 from utils.feature_extract import FEATURE_COLUMNS
 from utils.promise_ingest import load_promise_datasets
 
+# PyArrow is optional; its multithreaded CSV reader parses typed columns
+# without pandas' Python-level type inference
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# skl2onnx is optional; it exports the model for onnxruntime inference
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    SKL2ONNX_AVAILABLE = True
+except ImportError:
+    SKL2ONNX_AVAILABLE = False
+
+# Treelite/TL2cgen are optional; they compile the trained trees to native code
+try:
+    import treelite
+    import tl2cgen
+    TREELITE_AVAILABLE = True
+except ImportError:
+    TREELITE_AVAILABLE = False
+
+# Estimators skl2onnx can convert; HistGradientBoosting models are not exported
+ONNX_EXPORTABLE = (RandomForestClassifier, ExtraTreesClassifier)
+
+
+# Worker count for the forests: all cores, but never more than there are trees
+def _forest_jobs(n_estimators: int) -> int:
+    return min(os.cpu_count() or 1, n_estimators)
+
+
+# Upper bound on the bootstrap sample each forest tree is grown on; beyond it
+# fit time keeps growing with N while accuracy barely moves
+MAX_BOOTSTRAP_SAMPLES = 100_000
+
+# Below this many training rows hist_gb trains without an early-stopping
+# hold-out; a 10% validation split of a small set is a handful of rows
+HGB_EARLY_STOPPING_MIN_SAMPLES = 1000
+
+
+# Estimators selectable with --model; the forests build their trees on all cores
+MODEL_FACTORIES = {
+    # Depth- and leaf-limited trees keep the pickle small and predict() shallow;
+    # the out-of-bag score tracks accuracy without extra fits
+    "random_forest": lambda: RandomForestClassifier(
+        n_estimators=100, max_depth=16, min_samples_leaf=5, max_features="sqrt",
+        oob_score=True, random_state=42, n_jobs=_forest_jobs(100),
+    ),
+    "extra_trees": lambda: ExtraTreesClassifier(
+        n_estimators=200, random_state=42, n_jobs=_forest_jobs(200),
+    ),
+    # Default: binned features and OpenMP-parallel histograms fit much faster
+    # than the forests and pickle far smaller
+    "hist_gb": lambda: HistGradientBoostingClassifier(
+        max_iter=200, learning_rate=0.1, max_bins=255, early_stopping=True,
+        random_state=42,
+    ),
+}
+
+
+def _read_csv(csv_path: str) -> pd.DataFrame:
+    """Read a CSV with PyArrow when available, otherwise with pandas.
+
+    PyArrow parses the feature columns as float32 and the label as int8;
+    other columns keep their inferred types.
+    """
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(csv_path)
+    column_types = {col: pa.float32() for col in FEATURE_COLUMNS}
+    column_types["label"] = pa.int8()
+    table = pa_csv.read_csv(
+        csv_path, convert_options=pa_csv.ConvertOptions(column_types=column_types)
+    )
+    return table.to_pandas()
+
+
+def _read_csv_cached(csv_path: str) -> pd.DataFrame:
+    """Read a CSV through a Parquet copy kept next to it.
+
+    The copy (``<name>.cache.parquet``) is reused while it is newer than the
+    CSV and rewritten otherwise; caching is best-effort.
+    """
+    cache_path = os.path.splitext(csv_path)[0] + ".cache.parquet"
+    if (os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) >= os.path.getmtime(csv_path)):
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception:
+            pass  # unreadable or no Parquet engine: parse the CSV again
+    df = _read_csv(csv_path)
+    try:
+        df.to_parquet(cache_path, compression="zstd", index=False)
+    except Exception:
+        pass
+    return df
+
 
 def load_dataset(csv_path: str) -> pd.DataFrame:
     """Load the dataset containing features and labels.
@@ -39,7 +150,7 @@ def load_dataset(csv_path: str) -> pd.DataFrame:
         raise FileNotFoundError(f"Dataset file not found: {csv_path}")
     
     try:
-    df = pd.read_csv(csv_path)
+        df = _read_csv_cached(csv_path)
     except Exception as e:
         raise ValueError(f"Error reading CSV file {csv_path}: {str(e)}")
     
@@ -51,89 +162,189 @@ def load_dataset(csv_path: str) -> pd.DataFrame:
         raise ValueError(f"Dataset missing required columns: {missing}")
     
     # Check for missing values in features
-    missing_values = df[FEATURE_COLUMNS].isnull().sum()
-    if missing_values.sum() > 0:
+    features = df[FEATURE_COLUMNS]
+    if features.isna().any(axis=None):
+        missing_values = features.isna().sum()
         print(f"Warning: Found missing values in features:\n{missing_values[missing_values > 0]}")
-        # Fill missing values with median for numeric columns
-        for col in FEATURE_COLUMNS:
-            if df[col].isnull().sum() > 0:
-                df[col].fillna(df[col].median(), inplace=True)
+        # Fill missing values with each column's median in one assignment
+        df[FEATURE_COLUMNS] = features.fillna(features.median())
         print("Missing values filled with median.")
     
     return df
 
 
-def train_model(df: pd.DataFrame) -> Tuple[RandomForestClassifier, float, str]:
+def _split_indices(y: np.ndarray, test_size: float, stratify: bool, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return shuffled (train, test) row indices for a hold-out split.
+
+    With stratify, each class is shuffled and cut separately, keeping at
+    least one row of every class on each side.
+    """
+    rng = np.random.default_rng(seed)
+    if stratify:
+        groups = [rng.permutation(np.flatnonzero(y == label)) for label in np.unique(y)]
+    else:
+        groups = [rng.permutation(len(y))]
+    train_parts, test_parts = [], []
+    for idx in groups:
+        n_train = int(round(len(idx) * (1.0 - test_size)))
+        if stratify:
+            n_train = min(max(n_train, 1), len(idx) - 1)
+        train_parts.append(idx[:n_train])
+        test_parts.append(idx[n_train:])
+    # Interleave the classes again so training order carries no label pattern
+    return rng.permutation(np.concatenate(train_parts)), rng.permutation(np.concatenate(test_parts))
+
+
+def _aligned_empty(shape: Tuple[int, ...], dtype, alignment: int = 64) -> np.ndarray:
+    """Return an uninitialized C-contiguous array whose data starts on an
+    `alignment`-byte (cache-line) boundary."""
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    raw = np.empty(nbytes + alignment, dtype=np.uint8)
+    start = -raw.ctypes.data % alignment
+    return raw[start:start + nbytes].view(dtype).reshape(shape)
+
+
+def _class_counts(y: np.ndarray) -> dict:
+    """Return {label: count} for a label array."""
+    labels, counts = np.unique(y, return_counts=True)
+    return dict(zip(labels.tolist(), counts.tolist()))
+
+
+def train_model(df: pd.DataFrame, model_type: str = "hist_gb") -> Tuple[ClassifierMixin, float, str]:
     """Train the model and return (model, accuracy, report).
     
     Args:
         df: DataFrame with features and labels
+        model_type: Key of MODEL_FACTORIES selecting the estimator
         
     Returns:
         Tuple of (trained_model, accuracy, classification_report)
         
     Raises:
-        ValueError: If dataset is too small or has invalid data
+        ValueError: If dataset is too small, has invalid data, or the fitted
+            model predicts a constant
     """
     if len(df) < 10:
         raise ValueError(f"Dataset too small: {len(df)} samples. Need at least 10 samples.")
     
-    X = df[FEATURE_COLUMNS].copy()
-    y = df["label"].astype(int)
+    # float32 is what sklearn's trees split on internally, so casting once
+    # here halves the array and spares fit() its own converting copy
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+    y = df["label"].to_numpy(dtype=np.int64)
 
     # Check for valid label values
-    unique_labels = y.unique()
+    unique_labels, class_counts = np.unique(y, return_counts=True)
     if len(unique_labels) < 2:
         raise ValueError(f"Dataset has only one class: {unique_labels}. Need at least 2 classes.")
     
-    # Check for NaN or infinite values
-    if X.isnull().any().any():
-        raise ValueError("Features contain NaN values after preprocessing")
-    if np.isinf(X.values).any():
-        raise ValueError("Features contain infinite values")
+    # Check for NaN or infinite values in a single pass
+    if not np.isfinite(X).all():
+        raise ValueError("Features contain NaN or infinite values")
     
     # Use stratify only if we have enough samples per class
-    value_counts = y.value_counts()
-    can_stratify = len(y) >= 20 and len(value_counts) >= 2 and all(value_counts >= 2)
-    stratify_param = y if can_stratify else None
-    if stratify_param is None:
+    can_stratify = len(y) >= 20 and bool((class_counts >= 2).all())
+    if not can_stratify:
         print("Warning: Using non-stratified split (dataset too small or imbalanced)")
-    
-    try:
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.25, random_state=42, stratify=stratify_param
-        )
-    except ValueError as e:
-        # If stratify fails, try without it
-        print(f"Warning: Stratified split failed: {e}. Using non-stratified split.")
-    X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.25, random_state=42, stratify=None
-    )
+
+    train_idx, test_idx = _split_indices(y, test_size=0.25, stratify=can_stratify, seed=42)
+    # Gather both sides into one aligned buffer, train rows first, so the
+    # splits are contiguous views rather than two separate fancy-index copies
+    X_split = _aligned_empty(X.shape, X.dtype)
+    np.take(X, np.concatenate([train_idx, test_idx]), axis=0, out=X_split)
+    X_train, X_test = X_split[:len(train_idx)], X_split[len(train_idx):]
+    y_train, y_test = y[train_idx], y[test_idx]
 
     if len(X_train) < 5:
         raise ValueError(f"Training set too small: {len(X_train)} samples")
     
     print(f"Training on {len(X_train)} samples, testing on {len(X_test)} samples")
-    print(f"Class distribution - Train: {y_train.value_counts().to_dict()}, Test: {y_test.value_counts().to_dict()}")
+    print(f"Class distribution - Train: {_class_counts(y_train)}, Test: {_class_counts(y_test)}")
     
-    model = RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=-1)
-    model.fit(X_train, y_train)
-
-    y_pred = model.predict(X_test)
-    acc = float(accuracy_score(y_test, y_pred))
+    model = MODEL_FACTORIES[model_type]()
+    if getattr(model, "bootstrap", False):
+        model.set_params(max_samples=min(1.0, MAX_BOOTSTRAP_SAMPLES / len(X_train)))
+    if isinstance(model, HistGradientBoostingClassifier):
+        # The default 20-sample leaves cannot split a small set (e.g. the
+        # sample.csv fallback) at all, so size them to the data
+        model.set_params(
+            min_samples_leaf=min(20, max(1, len(X_train) // 10)),
+            early_stopping=len(X_train) >= HGB_EARLY_STOPPING_MIN_SAMPLES,
+        )
+    # The estimators parallelize themselves; single-threaded BLAS keeps the
+    # forest workers from oversubscribing the cores. The forests grow their
+    # trees in threads that all read the same X_train, so nothing is pickled
+    # or memory-mapped for workers.
+    with threadpool_limits(limits=1, user_api="blas"):
+        model.fit(X_train, y_train)
+        y_pred = model.predict(X_test)
+        train_proba = model.predict_proba(X_train)
+    # A model without a single useful split scores every file the same; refuse
+    # it rather than save and serve a constant predictor
+    if np.ptp(train_proba, axis=0).max() == 0:
+        raise ValueError(
+            f"{type(model).__name__} predicts the same probabilities for every "
+            f"sample; it learned nothing from {len(X_train)} training rows"
+        )
+    # Plain array comparison; accuracy_score would re-validate both arrays first
+    acc = float((y_pred == y_test).mean())
     report = classification_report(y_test, y_pred)
     return model, acc, report
 
 
+def export_onnx(model: ClassifierMixin, onnx_path: str) -> None:
+    """Export a fitted classifier to ONNX with a float32 input named ``X``.
+
+    Probabilities are emitted as a plain tensor (no ZipMap), and the class
+    labels are stored in the model metadata under ``classes``.
+    """
+    onx = convert_sklearn(
+        model,
+        initial_types=[("X", FloatTensorType([None, len(FEATURE_COLUMNS)]))],
+        options={"zipmap": False},
+    )
+    meta = onx.metadata_props.add()
+    meta.key = "classes"
+    meta.value = json.dumps(model.classes_.tolist())
+    with open(onnx_path, "wb") as f:
+        f.write(onx.SerializeToString())
+
+
+def export_treelite(model: ClassifierMixin, lib_path: str) -> None:
+    """Compile a fitted tree model into a native shared library with TL2cgen.
+
+    Compilation needs a C compiler (gcc) and can take several minutes for a
+    large forest.
+    """
+    tl_model = treelite.sklearn.import_model(model)
+    tl2cgen.export_lib(
+        tl_model, toolchain="gcc", libpath=lib_path,
+        params={"parallel_comp": os.cpu_count() or 1, "quantize": 1},
+    )
+
+
 def main() -> None:
     """Main function to train and save the model."""
+    parser = argparse.ArgumentParser(description="Train the software defect detection model.")
+    parser.add_argument(
+        "--model", choices=sorted(MODEL_FACTORIES), default="hist_gb",
+        help="estimator to train (default: hist_gb)",
+    )
+    parser.add_argument(
+        "--treelite", action="store_true",
+        help="also compile the model to model/defect_model.so for faster prediction",
+    )
+    args = parser.parse_args()
+
     base_dir = os.path.dirname(os.path.abspath(__file__))
     data_path = os.path.join(base_dir, "datasets", "sample.csv")
     model_dir = os.path.join(base_dir, "model")
     model_path = os.path.join(model_dir, "defect_model.pkl")
+    lib_path = os.path.join(model_dir, "defect_model.so")
+    onnx_path = os.path.join(model_dir, "defect_model.onnx")
 
     try:
-    os.makedirs(model_dir, exist_ok=True)
+        os.makedirs(model_dir, exist_ok=True)
     except Exception as e:
         print(f"Error creating model directory: {e}")
         sys.exit(1)
@@ -144,9 +355,9 @@ def main() -> None:
     
     try:
         promise_df = load_promise_datasets(datasets_dir)
-    if promise_df is not None and len(promise_df) > 0:
-        df = promise_df
-        print(f"Loaded PROMISE datasets: {len(df)} rows")
+        if promise_df is not None and len(promise_df) > 0:
+            df = promise_df
+            print(f"Loaded PROMISE datasets: {len(df)} rows")
     except Exception as e:
         print(f"Warning: Error loading PROMISE datasets: {e}")
         print("Falling back to sample dataset...")
@@ -160,7 +371,7 @@ def main() -> None:
         
         try:
             print("Loading sample dataset...")
-        df = load_dataset(data_path)
+            df = load_dataset(data_path)
             print(f"Loaded sample dataset: {len(df)} rows")
         except Exception as e:
             print(f"Error loading sample dataset: {e}")
@@ -168,25 +379,50 @@ def main() -> None:
     
     # Train the model
     try:
-    model, acc, report = train_model(df)
+        model, acc, report = train_model(df, args.model)
     except Exception as e:
         print(f"Error training model: {e}")
         sys.exit(1)
 
     # Save the model
     try:
-    with open(model_path, "wb") as f:
-        pickle.dump(model, f)
+        # Uncompressed joblib keeps the tree arrays memory-mappable on load
+        joblib.dump(model, model_path)
         print(f"\n{'='*60}")
         print("SUCCESS: Model trained and saved!")
         print(f"{'='*60}")
         print(f"Model saved to: {model_path}")
         print(f"Accuracy: {round(acc, 4)}")
+        if getattr(model, "oob_score_", None) is not None:
+            print(f"OOB accuracy: {round(model.oob_score_, 4)}")
         print(f"\nClassification report:\n{report}")
     except Exception as e:
         print(f"Error saving model: {e}")
         sys.exit(1)
 
+    # Export for onnxruntime when possible; the pickle above remains the fallback
+    if SKL2ONNX_AVAILABLE and not isinstance(model, ONNX_EXPORTABLE):
+        print(f"Skipping ONNX export: skl2onnx cannot convert {type(model).__name__}")
+    elif SKL2ONNX_AVAILABLE:
+        try:
+            export_onnx(model, onnx_path)
+            print(f"ONNX model saved to: {onnx_path}")
+        except Exception as e:
+            # skl2onnx errors can embed whole attribute arrays; keep the summary line
+            print(f"Warning: ONNX export failed: {str(e).splitlines()[0][:200]}")
+
+    # Optionally compile the model; the pickle above remains the fallback
+    if args.treelite:
+        if not TREELITE_AVAILABLE:
+            print("Warning: --treelite requires treelite and tl2cgen (pip install treelite tl2cgen)")
+        else:
+            try:
+                print("Compiling model with Treelite...")
+                export_treelite(model, lib_path)
+                print(f"Compiled model saved to: {lib_path}")
+            except Exception as e:
+                print(f"Warning: Treelite export failed: {e}")
+
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,27 @@
 import os
-import pickle
+import json
+import threading
 from typing import Dict, Tuple
 
-import pandas as pd
+import joblib
+import numpy as np
+import sklearn
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble._forest import ForestClassifier
+
+# Numba is optional; it compiles the forest traversal in NumbaForestPredictor
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# onnxruntime is optional; it runs the ONNX export written by train_model.py
+try:
+    import onnxruntime
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
 
 
 FEATURE_COLUMNS = [
@@ -16,14 +34,198 @@ FEATURE_COLUMNS = [
 ]
 
 
-def metrics_to_features(metrics: Dict[str, float]) -> pd.DataFrame:
-    """Map computed metrics to a one-row pandas DataFrame of features.
+_FEATURE_INDEX = tuple(enumerate(FEATURE_COLUMNS))
+
+# The synthetic fallback model is deterministic, so it is trained once and
+# kept per scikit-learn version (pickles don't carry across versions)
+FALLBACK_MODEL_CACHE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "defect",
+    f"fallback_rf-{sklearn.__version__}.pkl",
+)
+
+# Per-thread (1, n_features) float32 row reused by metrics_to_features
+_row_buffer = threading.local()
+
+
+def metrics_to_features(metrics: Dict[str, float]) -> np.ndarray:
+    """Map computed metrics to a (1, n_features) feature row.
 
     Ensures consistent ordering and presence of all required feature columns.
     Missing metrics default to 0.0.
+
+    Values are stored as contiguous float32, the dtype sklearn's tree models
+    use internally, so predict() does not have to cast a copy; a bare array
+    also skips the pandas wrapping and feature-name checks. The row is a
+    per-thread buffer that the next call on the same thread overwrites, so
+    use it right away rather than keeping it around.
+    """
+    values = getattr(_row_buffer, "values", None)
+    if values is None:
+        values = _row_buffer.values = np.empty((1, len(FEATURE_COLUMNS)), dtype=np.float32)
+    for i, name in _FEATURE_INDEX:
+        values[0, i] = metrics.get(name, 0.0)
+    return values
+
+
+def _drop_feature_names(model) -> None:
+    """Let a model fitted on a DataFrame take plain arrays without warning.
+
+    Features are passed as an ndarray in FEATURE_COLUMNS order. The column
+    order is checked here once, instead of sklearn checking names on every
+    predict.
+    """
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None and list(names) == FEATURE_COLUMNS:
+        del model.feature_names_in_
+
+
+class ForestVotePredictor:
+    """Predict with a fitted forest classifier by summing its trees' votes directly.
+
+    Forest predict() validates its input and dispatches the trees through a
+    joblib pool on every call, which dominates single-row latency. This loops
+    over the low-level tree objects instead, averaging the per-tree class
+    probabilities exactly as predict_proba() does.
+    """
+
+    def __init__(self, forest):
+        self._trees = [est.tree_ for est in forest.estimators_]
+        self.classes_ = forest.classes_
+        self.n_classes_ = len(forest.classes_)
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        proba = np.zeros((X.shape[0], self.n_classes_))
+        for tree in self._trees:
+            votes = tree.predict(X)[:, :self.n_classes_]
+            normalizer = votes.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            proba += votes / normalizer
+        proba /= len(self._trees)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True)
+    def _forest_proba(feature, threshold, left, right, missing_left, value, roots, X):
+        """Average the leaf class probabilities of every tree for each row of X."""
+        proba = np.zeros((X.shape[0], value.shape[1]))
+        for i in range(X.shape[0]):
+            for root in roots:
+                node = root
+                while left[node] != -1:
+                    x = X[i, feature[node]]
+                    if x != x:  # NaN follows the side chosen at fit time
+                        go_left = missing_left[node]
+                    else:
+                        go_left = x <= threshold[node]
+                    node = left[node] if go_left else right[node]
+                proba[i] += value[node]
+        return proba / roots.shape[0]
+
+
+class NumbaForestPredictor(ForestVotePredictor):
+    """ForestVotePredictor whose traversal runs in one Numba-compiled kernel.
+
+    All trees are flattened once into contiguous node arrays (children offset
+    into the shared arrays, leaf values normalized to probabilities), so a
+    prediction is a single compiled call instead of one Python call per tree.
+    """
+
+    def __init__(self, forest):
+        super().__init__(forest)
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        for tree in self._trees:
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            features.append(tree.feature)
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, -1, tree.children_left + offset))
+            rights.append(np.where(is_leaf, -1, tree.children_right + offset))
+            go_left = getattr(tree, "missing_go_to_left", None)
+            missing.append(np.zeros(n_nodes, dtype=bool) if go_left is None else go_left.astype(bool))
+            votes = tree.value[:, 0, :self.n_classes_]
+            normalizer = votes.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(votes / normalizer)
+            offset += n_nodes
+        self._feature = np.concatenate(features).astype(np.intp)
+        self._threshold = np.concatenate(thresholds).astype(np.float64)
+        self._left = np.concatenate(lefts).astype(np.intp)
+        self._right = np.concatenate(rights).astype(np.intp)
+        self._missing_left = np.concatenate(missing)
+        self._value = np.ascontiguousarray(np.concatenate(values), dtype=np.float64)
+        self._roots = np.asarray(roots, dtype=np.intp)
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return _forest_proba(
+            self._feature, self._threshold, self._left, self._right,
+            self._missing_left, self._value, self._roots, X,
+        )
+
+
+class OnnxPredictor:
+    """Predict with an ONNX export of the model, mirroring the sklearn predict() API."""
+
+    def __init__(self, onnx_path: str):
+        options = onnxruntime.SessionOptions()
+        # Requests predict a single row; a thread pool only adds overhead
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        self._session = onnxruntime.InferenceSession(
+            onnx_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        metadata = self._session.get_modelmeta().custom_metadata_map
+        self.classes_ = np.asarray(json.loads(metadata["classes"]))
+        self._input_name = self._session.get_inputs()[0].name
+
+    def _run(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return self._session.run(None, {self._input_name: X})
+
+    def predict(self, X):
+        return self._run(X)[0]
+
+    def predict_proba(self, X):
+        return self._run(X)[1]
+
+
+def _load_onnx(model_path: str):
+    """Return an OnnxPredictor for the ONNX file next to model_path if it is at
+    least as new as the pickle, otherwise None."""
+    if not ONNXRUNTIME_AVAILABLE:
+        return None
+    onnx_path = os.path.splitext(model_path)[0] + ".onnx"
+    try:
+        if os.path.getmtime(onnx_path) < os.path.getmtime(model_path):
+            return None  # exported from an older model
+        return OnnxPredictor(onnx_path)
+    except Exception:
+        return None
+
+
+def fast_predictor(model):
+    """Wrap single-output forest classifiers in a NumbaForestPredictor (or a
+    ForestVotePredictor without Numba); return other models as is.
+
+    The Numba kernel is compiled before the predictor is returned.
     """
-    row = {name: float(metrics.get(name, 0.0)) for name in FEATURE_COLUMNS}
-    return pd.DataFrame([row], columns=FEATURE_COLUMNS)
+    if isinstance(model, ForestClassifier) and getattr(model, "n_outputs_", 1) == 1:
+        if NUMBA_AVAILABLE:
+            predictor = NumbaForestPredictor(model)
+            # Compile (or load numba's on-disk cache) here, once per process,
+            # so no entry point's first prediction pays for it
+            predictor.predict_proba(np.zeros((1, model.n_features_in_), dtype=np.float32))
+            return predictor
+        return ForestVotePredictor(model)
+    return model
 
 
 def _train_fallback_model() -> RandomForestClassifier:
@@ -31,7 +233,6 @@ def _train_fallback_model() -> RandomForestClassifier:
 
     This ensures the app works even before running the full training script.
     """
-    import numpy as np
     rng = np.random.default_rng(42)
     n = 128
     X = rng.normal(loc=0.0, scale=1.0, size=(n, len(FEATURE_COLUMNS)))
@@ -48,18 +249,44 @@ def _train_fallback_model() -> RandomForestClassifier:
 def load_or_train_model(model_path: str) -> Tuple[RandomForestClassifier, str]:
     """Load a trained model if available; otherwise train a fallback model.
 
-    Returns the model and a human-friendly model name string.
+    An up-to-date ONNX export next to model_path is preferred when
+    onnxruntime is installed. Returns the model and a human-friendly model
+    name string.
     """
+    predictor = _load_onnx(model_path)
+    if predictor is not None:
+        onnx_name = os.path.basename(os.path.splitext(model_path)[0] + ".onnx")
+        return predictor, f"Loaded ONNX model ({onnx_name})"
+
     try:
         if os.path.exists(model_path):
-            with open(model_path, 'rb') as f:
-                model = pickle.load(f)
+            # Memory-map the estimator's arrays instead of copying them through
+            # the unpickler; plain pickle files load the same way
+            model = joblib.load(model_path, mmap_mode='r')
+            _drop_feature_names(model)
             return model, f"Loaded saved model ({os.path.basename(model_path)})"
     except Exception:
         # Fall through to fallback
         pass
 
-    model = _train_fallback_model()
+    model = _load_or_train_fallback_model()
     return model, "Fallback RandomForest (synthetic)"
 
 
+def _load_or_train_fallback_model() -> RandomForestClassifier:
+    """Load the fallback model from FALLBACK_MODEL_CACHE, training and caching it if needed."""
+    try:
+        return joblib.load(FALLBACK_MODEL_CACHE)
+    except Exception:
+        pass
+
+    model = _train_fallback_model()
+    try:
+        os.makedirs(os.path.dirname(FALLBACK_MODEL_CACHE), exist_ok=True)
+        joblib.dump(model, FALLBACK_MODEL_CACHE)
+    except Exception:
+        # Caching is best-effort (e.g. read-only home directory)
+        pass
+    return model
+
+
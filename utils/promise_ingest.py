@@ -1,15 +1,74 @@
+import glob
+import hashlib
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 
+import numpy as np
 import pandas as pd
 
 from .feature_extract import FEATURE_COLUMNS
 
+# PyArrow is optional; its CSV reader parses only the projected columns, on
+# multiple threads, in C++
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 
 PROMISE_FILENAMES = [
     "cm1.csv", "kc1.csv", "kc2.csv", "pc1.csv", "jm1.csv",
 ]
 
+# On free-threaded CPython (3.13t+) the per-file parse and mapping run in
+# parallel threads; with the GIL they would only contend, so files load serially
+FREE_THREADED = not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+# Combined, mapped frame cached next to the CSVs between training runs, as
+# <prefix>-<signature>.parquet; bump the version when the mapping changes
+PROMISE_CACHE_PREFIX = "_promise_cache"
+_PROMISE_CACHE_VERSION = 1
+
+# The only columns _map_promise_to_features reads; the rest are never parsed
+_PROMISE_COLUMNS = {
+    "loc", "lOCode", "locCodeAndComment", "v(g)", "branchCount",
+    "lOComment", "n", "defects", "label",
+}
+_PROMISE_DTYPES = {
+    name: np.float64
+    for name in ("loc", "lOCode", "locCodeAndComment", "v(g)", "branchCount", "lOComment", "n")
+}
+
+
+def _read_promise_csv(path: str) -> pd.DataFrame:
+    """Read only the _PROMISE_COLUMNS present in a PROMISE CSV."""
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(
+            path,
+            usecols=lambda col: col in _PROMISE_COLUMNS,  # tolerates missing columns
+            dtype=_PROMISE_DTYPES,
+            engine="c",
+        )
+    # The header decides the projection, since include_columns must all exist
+    header = pa_csv.open_csv(path).schema.names
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=[col for col in header if col in _PROMISE_COLUMNS],
+        column_types={col: pa.float64() for col in _PROMISE_DTYPES},
+    )
+    return pa_csv.read_csv(path, convert_options=convert_options).to_pandas()
+
+
+def _float_column(df: pd.DataFrame, *names: str) -> Optional[np.ndarray]:
+    """Return the first of the named columns present in df as a float64 array, or None."""
+    for name in names:
+        if name in df.columns:
+            return df[name].to_numpy(dtype=np.float64, copy=False)
+    return None
+
 
 def _map_promise_to_features(df: pd.DataFrame) -> pd.DataFrame:
     """Map PROMISE dataset columns into the app's FEATURE_COLUMNS schema.
@@ -25,74 +84,106 @@ def _map_promise_to_features(df: pd.DataFrame) -> pd.DataFrame:
       - num_functions and num_todos are not present; set to 0.0 as placeholders.
       - avg_line_length approximated by n / max(loc, 1).
     """
-    df_local = df.copy()
-
     # Normalize label
-    if "defects" in df_local.columns:
-        df_local["label"] = df_local["defects"].astype(str).str.lower().map({"true": 1, "false": 0})
-    elif "label" in df_local.columns:
-        df_local["label"] = df_local["label"].astype(int)
+    if "defects" in df.columns:
+        defects = df["defects"]
+        if pd.api.types.is_bool_dtype(defects):
+            label = defects.to_numpy(dtype=np.int64)
+        else:
+            lowered = np.char.lower(defects.to_numpy().astype(str))
+            is_true = lowered == "true"
+            if not (is_true | (lowered == "false")).all():
+                raise ValueError("PROMISE 'defects' column has values other than true/false")
+            label = is_true.astype(np.int64)
+    elif "label" in df.columns:
+        label = df["label"].to_numpy().astype(int)
     else:
         raise ValueError("PROMISE dataset missing 'defects' or 'label' column")
 
     # Extract source columns with fallbacks
-    loc = df_local.get("loc")
-    if loc is None:
-        # fall back to other line counts if needed
-        loc = df_local.get("lOCode")
-        if loc is None:
-            loc = df_local.get("locCodeAndComment")
+    # (fall back to other line counts if needed)
+    loc = _float_column(df, "loc", "lOCode", "locCodeAndComment")
     if loc is None:
         raise ValueError("PROMISE dataset missing a loc column (e.g., 'loc')")
 
-    v_g = df_local.get("v(g)")
-    if v_g is None:
-        v_g = df_local.get("branchCount")  # weaker proxy
+    v_g = _float_column(df, "v(g)", "branchCount")  # branchCount is a weaker proxy
     if v_g is None:
         raise ValueError("PROMISE dataset missing complexity column 'v(g)' or 'branchCount'")
 
-    lOComment = df_local.get("lOComment", pd.Series([0.0] * len(df_local)))
-    n_total = df_local.get("n", pd.Series([0.0] * len(df_local)))
+    zeros = np.zeros(len(df))
+    lOComment = _float_column(df, "lOComment")
+    n_total = _float_column(df, "n")
 
     # Compute engineered features
-    avg_line_length = (n_total.astype(float) / loc.replace(0, 1).astype(float)).astype(float)
+    avg_line_length = (n_total if n_total is not None else zeros) / np.where(loc == 0, 1.0, loc)
 
-    features = pd.DataFrame({
-        "loc": loc.astype(float),
-        "num_comments": lOComment.astype(float),
+    # Built once, directly in FEATURE_COLUMNS order
+    return pd.DataFrame({
+        "loc": loc,
+        "num_comments": lOComment if lOComment is not None else zeros,
         "num_functions": 0.0,  # placeholder, not in PROMISE
-        "cyclomatic_complexity_estimate": v_g.astype(float),
-        "avg_line_length": avg_line_length.astype(float),
+        "cyclomatic_complexity_estimate": v_g,
+        "avg_line_length": avg_line_length,
         "num_todos": 0.0,  # placeholder, not in PROMISE
-        "label": df_local["label"].astype(int),
-    })
+        "label": label,
+    }, columns=[*FEATURE_COLUMNS, "label"], copy=False)
+
 
-    # Ensure column order
-    return features[[*FEATURE_COLUMNS, "label"]]
+def _load_promise_file(path: str) -> Optional[pd.DataFrame]:
+    """Read and map one PROMISE CSV, or return None if it can't be used."""
+    try:
+        return _map_promise_to_features(_read_promise_csv(path))
+    except Exception:
+        # Skip problematic files but continue loading others
+        return None
+
+
+def _promise_cache_path(base_dir: str, paths: List[str]) -> str:
+    """Return the cache file for exactly these CSVs (name, mtime and size)."""
+    signature = hashlib.sha1(f"v{_PROMISE_CACHE_VERSION}\n".encode())
+    for path in paths:
+        st = os.stat(path)
+        signature.update(f"{os.path.basename(path)}:{st.st_mtime_ns}:{st.st_size}\n".encode())
+    return os.path.join(base_dir, f"{PROMISE_CACHE_PREFIX}-{signature.hexdigest()[:16]}.parquet")
 
 
 def load_promise_datasets(base_dir: str) -> Optional[pd.DataFrame]:
     """Load and combine available PROMISE CSVs from base_dir.
 
-    Returns None if no known files exist.
+    The combined frame is cached as Parquet in base_dir, keyed on the name,
+    mtime and size of every CSV it was built from, so adding, removing or
+    editing a file rebuilds it. Returns None if no known files exist.
     """
-    dataframes: List[pd.DataFrame] = []
-    for name in PROMISE_FILENAMES:
-        path = os.path.join(base_dir, name)
-        if not os.path.exists(path):
-            continue
+    paths = [os.path.join(base_dir, name) for name in PROMISE_FILENAMES]
+    paths = [path for path in paths if os.path.exists(path)]
+    if not paths:
+        return None
+
+    cache_path = _promise_cache_path(base_dir, paths)
+    if os.path.exists(cache_path):
         try:
-            df_raw = pd.read_csv(path)
-            df_mapped = _map_promise_to_features(df_raw)
-            dataframes.append(df_mapped)
+            return pd.read_parquet(cache_path)
         except Exception:
-            # Skip problematic files but continue loading others
-            continue
+            pass  # unreadable or no Parquet engine: rebuild from the CSVs
+
+    if FREE_THREADED and len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as executor:
+            loaded = list(executor.map(_load_promise_file, paths))
+    else:
+        loaded = [_load_promise_file(path) for path in paths]
+    dataframes: List[pd.DataFrame] = [df for df in loaded if df is not None]
 
     if not dataframes:
         return None
     combined = pd.concat(dataframes, axis=0, ignore_index=True)
     combined = combined.dropna().reset_index(drop=True)
+    try:
+        # Caches of other file sets can no longer be hit
+        for stale in glob.glob(os.path.join(base_dir, f"{PROMISE_CACHE_PREFIX}*.parquet")):
+            os.remove(stale)
+        combined.to_parquet(cache_path, compression="zstd", index=False)
+    except Exception:
+        pass  # caching is best-effort (read-only dir, no Parquet engine)
     return combined
 
 
@@ -1,8 +1,98 @@
 import re
-from typing import Dict
+from typing import Dict, Iterable
 
+# Hyperscan is optional; it matches the control/TODO tokens with a compiled
+# multi-pattern automaton instead of Python's backtracking regex engine
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
 
-CONTROL_KEYWORDS = re.compile(r"\b(if|elif|for|while|and|or|case|except|catch|&&|\|\|)\b")
+
+# All patterns are bytes: source is scanned as UTF-8 bytes, which avoids
+# building a str object per line. \b and \w are therefore ASCII-only.
+CONTROL_KEYWORDS = re.compile(rb"\b(if|elif|for|while|and|or|case|except|catch|&&|\|\|)\b")
+
+# Comment line prefixes in multiple languages (tuple for a single startswith)
+_COMMENT_PREFIXES = (b"#", b"//")
+
+# Very rough function detection (works for Python/JS/C-like), each paired
+# with the byte its matches end on
+_FUNC_PATTERNS = (
+    (re.compile(rb"\bdef\s+\w+\s*\("), b"("),
+    (re.compile(rb"\bfunction\s+\w+\s*\("), b"("),
+    (re.compile(rb"\b\w+\s+\w+\s*\(.*\)\s*\{"), b"{"),  # C-like returns
+)
+
+# A signature match touches at most this many non-blank lines (the C-like
+# one: return type, name, parameter list and brace each on their own line)
+_SIGNATURE_MAX_LINES = 4
+
+# Control tokens and TODO/FIXME tags in a single scan, told apart by group.
+# Signatures stay in their own pattern: in a shared alternation a C-like
+# signature match would swallow the control tokens after it.
+_TOKEN_RE = re.compile(
+    rb"(?P<control>" + CONTROL_KEYWORDS.pattern + rb")|(?P<todo>(?i:\b(?:TODO|FIXME)\b))"
+)
+
+# Hyperscan ids of the same two token patterns
+_HS_CONTROL, _HS_TODO = 0, 1
+
+
+def _compile_token_db():
+    """Compile the token patterns into a Hyperscan block-mode database."""
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[CONTROL_KEYWORDS.pattern, rb"\b(?:TODO|FIXME)\b"],
+        ids=[_HS_CONTROL, _HS_TODO],
+        elements=2,
+        flags=[0, hyperscan.HS_FLAG_CASELESS],
+    )
+    return db
+
+
+def _count_token(token_id, start, end, flags, counts):
+    """Hyperscan match callback: tally the match under its pattern id."""
+    counts[token_id] += 1
+
+
+_TOKEN_DB = _compile_token_db() if HYPERSCAN_AVAILABLE else None
+
+
+class _SignatureCounter:
+    """Count matches of a signature pattern over a stream of lines.
+
+    Gives the same count as findall() over the whole text: signatures may
+    span lines (Allman-style braces, return type on its own line), so the
+    last few non-blank lines not yet consumed by a match are kept and the
+    pattern is re-run when a line contains the byte a match must end on.
+    """
+
+    def __init__(self, pattern, end_byte):
+        self.pattern = pattern
+        self.end_byte = end_byte
+        self.tail = []
+        self.count = 0
+
+    def feed(self, line: bytes) -> None:
+        """Add a non-blank line (its line ending, if any, is just whitespace)."""
+        tail = self.tail
+        tail.append(line)
+        if len(tail) > _SIGNATURE_MAX_LINES:
+            del tail[0]
+        # Any new match ends in this line, so it must contain the end byte
+        if self.end_byte not in line:
+            return
+        text = b"\n".join(tail)  # blank lines between are whitespace only
+        pos = 0
+        for match in self.pattern.finditer(text):
+            self.count += 1
+            pos = match.end()
+        if pos:
+            # Matches end on a non-word byte, so \b at the new start behaves
+            # as it did in the full text
+            self.tail = [text[pos:]]
 
 
 def analyze_code(code_text: str) -> Dict[str, float]:
@@ -17,48 +107,73 @@ def analyze_code(code_text: str) -> Dict[str, float]:
       - avg_line_length: average length across non-empty lines
       - num_todos: occurrences of TODO/FIXME tags (used as warnings proxy)
     """
-    lines = code_text.splitlines()
-    non_empty_lines = [ln for ln in lines if ln.strip()]
-    loc = float(len(non_empty_lines))
+    return analyze_code_stream(code_text.encode("utf-8", "replace").splitlines())
 
-    # Comments in multiple languages
-    comment_line_starts = ("#", "//")
+
+def analyze_code_stream(lines: Iterable[bytes]) -> Dict[str, float]:
+    """Compute the analyze_code() metrics from an iterable of UTF-8 source lines.
+
+    Lines are consumed one at a time and only running counters are kept, so a
+    binary file object can be passed directly without reading or decoding it.
+    Trailing newlines on the lines are ignored. Function signatures split
+    across lines are counted as they would be in the joined text.
+    """
+    loc = 0
     num_comments = 0
+    num_control_tokens = 0
+    num_todos = 0
+    total_length = 0
+    token_counts = [0, 0]  # indexed by _HS_CONTROL / _HS_TODO
+    signatures = [_SignatureCounter(pattern, end) for pattern, end in _FUNC_PATTERNS]
+
     for ln in lines:
-        stripped = ln.strip()
-        if any(stripped.startswith(prefix) for prefix in comment_line_starts) or "/*" in stripped:
+        # Non-blank test without allocating a stripped copy of the line
+        if ln and not ln.isspace():
+            loc += 1
+            for counter in signatures:
+                counter.feed(ln)
+            # Length in characters without the line ending, counted
+            # arithmetically rather than by copying the line without it;
+            # only non-ASCII lines need decoding to count characters
+            length = len(ln) if ln.isascii() else len(ln.decode("utf-8", "replace"))
+            total_length += length - ln.endswith(b"\n") - ln.endswith(b"\r\n")
+
+        # Comments in multiple languages; lines without any comment marker
+        # skip the lstrip() copy entirely
+        if b"/*" in ln or (
+            (b"#" in ln or b"//" in ln) and ln.lstrip().startswith(_COMMENT_PREFIXES)
+        ):
             num_comments += 1
 
-    # Very rough function detection (works for Python/JS/C-like)
-    function_patterns = [
-        re.compile(r"\bdef\s+\w+\s*\("),
-        re.compile(r"\bfunction\s+\w+\s*\("),
-        re.compile(r"\b\w+\s+\w+\s*\(.*\)\s*\{"),  # C-like returns
-    ]
-    num_functions = 0
-    for pat in function_patterns:
-        num_functions += len(pat.findall(code_text))
+        # Complexity proxy (control tokens) and warnings proxy (TODO/FIXME)
+        if _TOKEN_DB is not None:
+            _TOKEN_DB.scan(ln, match_event_handler=_count_token, context=token_counts)
+            continue
+        for match in _TOKEN_RE.finditer(ln):
+            if match.lastgroup == "todo":
+                num_todos += 1
+            else:
+                num_control_tokens += 1
+
+    num_functions = sum(counter.count for counter in signatures)
+    num_control_tokens += token_counts[_HS_CONTROL]
+    num_todos += token_counts[_HS_TODO]
 
-    # Complexity proxy: count of control tokens
-    complexity_tokens = CONTROL_KEYWORDS.findall(code_text)
-    cyclomatic_complexity_estimate = float(len(complexity_tokens)) + 1.0  # +1 as a baseline
+    cyclomatic_complexity_estimate = num_control_tokens + 1  # +1 as a baseline
 
     # Average line length across non-empty lines
-    if non_empty_lines:
-        avg_line_length = sum(len(ln) for ln in non_empty_lines) / float(len(non_empty_lines))
+    if loc:
+        avg_line_length = total_length / loc
     else:
         avg_line_length = 0.0
 
-    # TODO/FIXME warnings proxy
-    num_todos = float(len(re.findall(r"\b(TODO|FIXME)\b", code_text, flags=re.IGNORECASE)))
-
+    # Counters stay ints; the model input is cast to float32 in one go when
+    # the feature row is built
     return {
         "loc": loc,
-        "num_comments": float(num_comments),
-        "num_functions": float(num_functions),
-        "cyclomatic_complexity_estimate": float(cyclomatic_complexity_estimate),
-        "avg_line_length": float(avg_line_length),
-        "num_todos": float(num_todos),
+        "num_comments": num_comments,
+        "num_functions": num_functions,
+        "cyclomatic_complexity_estimate": cyclomatic_complexity_estimate,
+        "avg_line_length": avg_line_length,
+        "num_todos": num_todos,
     }
-
-